@@ -0,0 +1,10 @@
+import pytest
+
+
+@pytest.fixture(scope='session', autouse=True)
+def temporary_cache(django_test_environment):
+    """Тесты не делят файловый кэш с запущенным сайтом (core/testing.py)."""
+    from core.testing import temporary_cache
+
+    with temporary_cache():
+        yield
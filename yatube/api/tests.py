@@ -0,0 +1,256 @@
+import hashlib
+import io
+import json
+import shutil
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import (Client, TestCase, TransactionTestCase,
+                         override_settings)
+from django.urls import reverse
+
+from posts.models import Follow, Group, ImageUpload, Post
+from posts.uploads import UploadError, write_chunk
+from posts.utils import bump_latest_post_version, latest_post_id
+
+User = get_user_model()
+
+
+class ApiViewsTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        Post.objects.bulk_create([
+            Post(text=f'Тестовый пост{i}', author=cls.user, group=cls.group)
+            for i in range(13)
+        ])
+
+    def setUp(self):
+        cache.clear()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def test_cursor_pagination(self):
+        """Курсор ведёт на следующую страницу без повторов."""
+        response = self.client.get(reverse('api:index'))
+        first_page = response.json()
+        self.assertEqual(len(first_page['results']), 10)
+        response = self.client.get(
+            reverse('api:index'), {'cursor': first_page['next']}
+        )
+        second_page = response.json()
+        self.assertEqual(len(second_page['results']), 3)
+        self.assertIsNone(second_page['next'])
+        ids = [post['id'] for post in
+               first_page['results'] + second_page['results']]
+        self.assertEqual(len(set(ids)), Post.objects.count())
+
+    def test_sparse_fields(self):
+        """В ответе только поля из ?fields=."""
+        response = self.client.get(
+            reverse('api:group_list', kwargs={'slug': self.group.slug}),
+            {'fields': 'id,author'}
+        )
+        post = response.json()['results'][0]
+        self.assertEqual(set(post), {'id', 'author'})
+        self.assertEqual(post['author'], self.user.username)
+        response = self.client.get(reverse('api:index'), {'fields': 'hash'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_etag(self):
+        """Повторный запрос с If-None-Match получает 304."""
+        url = reverse('api:profile', kwargs={'username': self.user.username})
+        response = self.client.get(url)
+        response_2 = self.client.get(
+            url, HTTP_IF_NONE_MATCH=response['ETag']
+        )
+        self.assertEqual(response_2.status_code, 304)
+
+    def test_post_detail_and_not_found(self):
+        post = Post.objects.first()
+        response = self.client.get(
+            reverse('api:post_detail', kwargs={'post_id': post.pk}),
+            {'fields': 'text,comments'}
+        )
+        self.assertEqual(
+            response.json(), {'text': post.text, 'comments': []}
+        )
+        response = self.client.get(
+            reverse('api:post_detail', kwargs={'post_id': 999})
+        )
+        self.assertEqual(response.status_code, 404)
+
+    def test_follow_index(self):
+        response = self.client.get(reverse('api:follow_index'))
+        self.assertEqual(response.status_code, 401)
+        follower = User.objects.create_user(username='follower')
+        Follow.objects.create(user=follower, author=self.user)
+        self.authorized_client.force_login(follower)
+        response = self.authorized_client.get(reverse('api:follow_index'))
+        self.assertEqual(len(response.json()['results']), 10)
+
+    def test_new_posts(self):
+        """Счётчик новых постов; при актуальном since база не нужна."""
+        url = reverse('api:new_posts')
+        latest = Post.objects.latest('pk').pk
+        response = self.client.get(url, {'since': latest - 3})
+        self.assertEqual(response.json()['count'], 3)
+        response = self.client.get(
+            url, {'since': latest - 3, 'group': 'other-slug'}
+        )
+        self.assertEqual(response.json()['count'], 0)
+        with self.assertNumQueries(0):
+            response = self.client.get(url, {'since': latest})
+        self.assertEqual(response.json()['count'], 0)
+
+    def test_latest_post_id_version(self):
+        """Отметка из кэша верна, пока не сменилась версия."""
+        latest = latest_post_id()
+        Post.objects.bulk_create([Post(text='Новый', author=self.user)])
+        with self.assertNumQueries(0):
+            self.assertEqual(latest_post_id(), latest)
+        bump_latest_post_version()
+        self.assertEqual(latest_post_id(), latest + 1)
+
+    def test_autocomplete(self):
+        """Поиск по префиксу названия и slug, индекс видит новые группы."""
+        url = reverse('api:autocomplete_groups')
+        response = self.client.get(url, {'q': 'тест'})
+        self.assertEqual(
+            response.json()['results'],
+            [{'id': self.group.pk, 'title': self.group.title,
+              'slug': self.group.slug}]
+        )
+        self.assertEqual(
+            len(self.client.get(url, {'q': 'TEST-'}).json()['results']), 1
+        )
+        Group.objects.create(title='Другая', slug='other',
+                             description='Описание')
+        response = self.client.get(url, {'q': 'друг'})
+        self.assertEqual(response.json()['results'][0]['slug'], 'other')
+        response = self.client.get(
+            reverse('api:autocomplete_users'), {'q': 'au'}
+        )
+        self.assertEqual(response.json()['results'][0]['username'], 'auth')
+
+
+TEMP_DIR = tempfile.mkdtemp()
+SMALL_GIF = (
+    b'\x47\x49\x46\x38\x39\x61\x02\x00'
+    b'\x01\x00\x80\x00\x00\x00\x00\x00'
+    b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+    b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+    b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+    b'\x0A\x00\x3B'
+)
+
+
+@override_settings(MEDIA_ROOT=TEMP_DIR, UPLOAD_TEMP_DIR=TEMP_DIR)
+class NewPostsPollingTest(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='auth')
+
+    def test_poll_sees_committed_post(self):
+        """Новый пост сбрасывает отметку после коммита."""
+        url = reverse('api:new_posts')
+        Post.objects.create(text='Старый пост', author=self.user)
+        latest = self.client.get(url).json()['latest']
+        Post.objects.create(text='Новый пост', author=self.user)
+        response = self.client.get(url, {'since': latest, 'timeout': 1})
+        self.assertEqual(response.json()['count'], 1)
+        self.assertEqual(response.json()['latest'], latest + 1)
+
+
+class UploadApiTest(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_DIR, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='uploader')
+        self.client.force_login(self.user)
+
+    def start(self, data=SMALL_GIF, sha256=None):
+        response = self.client.post(
+            reverse('api:upload_create'),
+            json.dumps({
+                'filename': 'small.gif',
+                'size': len(data),
+                'sha256': sha256 or hashlib.sha256(data).hexdigest(),
+            }),
+            content_type='application/octet-stream'
+        )
+        self.assertEqual(response.status_code, 201)
+        return response.json()
+
+    def send(self, upload, offset, chunk):
+        return self.client.patch(
+            reverse('api:upload_detail', kwargs={'upload_id': upload['id']}),
+            chunk, content_type='application/octet-stream',
+            HTTP_UPLOAD_OFFSET=str(offset)
+        )
+
+    def test_chunked_upload_and_attach(self):
+        """Файл собирается из частей и прикрепляется к посту."""
+        upload = self.start()
+        self.assertEqual(upload['offset'], 0)
+        response = self.send(upload, 0, SMALL_GIF[:20])
+        self.assertEqual(response.json()['offset'], 20)
+        # После обрыва клиент узнаёт, откуда продолжать.
+        response = self.client.get(
+            reverse('api:upload_detail', kwargs={'upload_id': upload['id']})
+        )
+        self.assertEqual(response.json()['offset'], 20)
+        response = self.send(upload, 20, SMALL_GIF[20:])
+        self.assertEqual(response.json()['status'], ImageUpload.COMPLETE)
+        post = Post.objects.create(text='Пост', author=self.user)
+        response = self.client.post(reverse(
+            'api:upload_attach',
+            kwargs={'upload_id': upload['id'], 'post_id': post.pk}
+        ))
+        self.assertEqual(response.status_code, 200)
+        post.refresh_from_db()
+        self.assertTrue(post.image.name.startswith('posts/small'))
+        self.assertEqual(post.image.read(), SMALL_GIF)
+
+    def test_wrong_offset(self):
+        upload = self.start()
+        response = self.send(upload, 10, SMALL_GIF[10:])
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()['detail'], 'Ожидается смещение 0')
+
+    def test_stale_offset(self):
+        """Смещение сверяется с базой уже под блокировкой файла."""
+        upload = self.start()
+        stale = ImageUpload.objects.get(pk=upload['id'])
+        self.send(upload, 0, SMALL_GIF[:20])
+        with self.assertRaises(UploadError):
+            write_chunk(stale, 0, io.BytesIO(SMALL_GIF), len(SMALL_GIF))
+        response = self.send(upload, 20, SMALL_GIF[20:])
+        self.assertEqual(response.json()['status'], ImageUpload.COMPLETE)
+
+    def test_bad_checksum(self):
+        upload = self.start(sha256='0' * 64)
+        response = self.send(upload, 0, SMALL_GIF)
+        self.assertEqual(response.status_code, 422)
+        self.assertEqual(
+            ImageUpload.objects.get(pk=upload['id']).status,
+            ImageUpload.FAILED
+        )
+
+    def test_foreign_upload(self):
+        """Чужая загрузка не видна и не прикрепляется."""
+        upload = self.start()
+        self.client.force_login(User.objects.create_user(username='other'))
+        response = self.send(upload, 0, SMALL_GIF)
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,23 @@
+from django.urls import path
+
+from . import views
+
+app_name = 'api'
+
+urlpatterns = [
+    path('posts/', views.index, name='index'),
+    path('posts/new/', views.new_posts, name='new_posts'),
+    path('posts/<int:post_id>/', views.post_detail, name='post_detail'),
+    path('group/<slug:slug>/', views.group_posts, name='group_list'),
+    path('profile/<str:username>/', views.profile, name='profile'),
+    path('follow/', views.follow_index, name='follow_index'),
+    path('autocomplete/groups/', views.autocomplete_groups,
+         name='autocomplete_groups'),
+    path('autocomplete/users/', views.autocomplete_users,
+         name='autocomplete_users'),
+    path('uploads/', views.upload_create, name='upload_create'),
+    path('uploads/<uuid:upload_id>/', views.upload_detail,
+         name='upload_detail'),
+    path('uploads/<uuid:upload_id>/attach/<int:post_id>/',
+         views.upload_attach, name='upload_attach'),
+]
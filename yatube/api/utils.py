@@ -0,0 +1,131 @@
+import base64
+import hashlib
+
+from django.conf import settings
+from django.db.models import Q
+from django.http import JsonResponse
+from django.utils.cache import get_conditional_response
+from django.utils.dateparse import parse_datetime
+from django.utils.http import quote_etag
+
+# Поле ответа -> колонки, которые нужны для него в запросе.
+POST_FIELDS = {
+    'id': ('id',),
+    'text': ('text',),
+    'pub_date': ('pub_date',),
+    'author': ('author__username',),
+    'group': ('group__slug',),
+    'image': ('image',),
+}
+DEFAULT_POST_FIELDS = tuple(POST_FIELDS)
+
+
+class BadRequest(Exception):
+    """Некорректные параметры запроса к API."""
+
+
+def parse_fields(request, allowed=POST_FIELDS, default=DEFAULT_POST_FIELDS):
+    """Список полей из параметра ?fields=a,b,c."""
+    raw = request.GET.get('fields')
+    if not raw:
+        return list(default)
+    fields = [name.strip() for name in raw.split(',') if name.strip()]
+    unknown = set(fields) - set(allowed)
+    if unknown:
+        raise BadRequest(
+            'Неизвестные поля: {}'.format(', '.join(sorted(unknown)))
+        )
+    return fields
+
+
+def shape_queryset(queryset, fields):
+    """Загружаем из базы только колонки запрошенных полей."""
+    related = [name for name in ('author', 'group') if name in fields]
+    columns = {'id', 'pub_date'}
+    for name in fields:
+        columns.update(POST_FIELDS[name])
+    if related:
+        queryset = queryset.select_related(*related)
+    else:
+        queryset = queryset.select_related(None)
+    return queryset.only(*columns)
+
+
+def serialize_post(post, fields):
+    data = {}
+    for name in fields:
+        if name == 'author':
+            data[name] = post.author.username
+        elif name == 'group':
+            data[name] = post.group.slug if post.group_id else None
+        elif name == 'image':
+            data[name] = post.image.url if post.image else None
+        else:
+            data[name] = getattr(post, name)
+    return data
+
+
+def encode_cursor(post):
+    value = '{}|{}'.format(post.pub_date.isoformat(), post.pk)
+    return base64.urlsafe_b64encode(value.encode()).decode()
+
+
+def decode_cursor(cursor):
+    try:
+        value = base64.urlsafe_b64decode(cursor.encode()).decode()
+        pub_date, pk = value.rsplit('|', 1)
+        pub_date = parse_datetime(pub_date)
+        pk = int(pk)
+    except ValueError:
+        raise BadRequest('Некорректный курсор')
+    if pub_date is None:
+        raise BadRequest('Некорректный курсор')
+    return pub_date, pk
+
+
+def older_than_cursor(queryset, cursor):
+    queryset = queryset.order_by('-pub_date', '-pk')
+    if cursor:
+        pub_date, pk = decode_cursor(cursor)
+        queryset = queryset.filter(
+            Q(pub_date__lt=pub_date) | Q(pub_date=pub_date, pk__lt=pk)
+        )
+    return queryset
+
+
+def paginate_cursor(request, queryset, fields, archive=None):
+    """Курсорная пагинация: страница постов, которые старше курсора.
+
+    В отличие от OFFSET, стоимость запроса не растёт с номером страницы.
+    Когда горячие посты кончаются, страница дочитывается из archive."""
+    cursor = request.GET.get('cursor')
+    posts = list(shape_queryset(
+        older_than_cursor(queryset, cursor), fields
+    )[:settings.LIMIT + 1])
+    if archive is not None and len(posts) <= settings.LIMIT:
+        posts.extend(shape_queryset(
+            older_than_cursor(archive, cursor), fields
+        )[:settings.LIMIT + 1 - len(posts)])
+    has_next = len(posts) > settings.LIMIT
+    posts = posts[:settings.LIMIT]
+    return {
+        'results': [serialize_post(post, fields) for post in posts],
+        'next': encode_cursor(posts[-1]) if has_next else None,
+    }
+
+
+def json_response(request, data, status=200):
+    """JSON-ответ с ETag; при совпадении If-None-Match отдаём 304."""
+    response = JsonResponse(
+        data, status=status, json_dumps_params={'ensure_ascii': False}
+    )
+    if status != 200:
+        return response
+    response['ETag'] = quote_etag(hashlib.md5(response.content).hexdigest())
+    return get_conditional_response(
+        request, etag=response['ETag'], response=response
+    )
+
+
+def error_response(request, message, status=400):
+    return json_response(request, {'detail': message}, status=status)
@@ -0,0 +1,273 @@
+import json
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.http import Http404
+from django.shortcuts import get_object_or_404
+from django.views.decorators.http import require_http_methods
+
+from posts import autocomplete, uploads
+from posts.models import ArchivedPost, Follow, Group, ImageUpload, Post, User
+from posts.utils import latest_post_id
+from .utils import (POST_FIELDS, BadRequest, error_response, json_response,
+                    paginate_cursor, parse_fields, serialize_post,
+                    shape_queryset)
+
+POST_DETAIL_FIELDS = dict(POST_FIELDS, comments=())
+
+
+def api_view(view=None, *, methods=('GET',)):
+    """Эндпоинт API: ошибки отдаются в JSON, а не HTML-страницей.
+
+    @api_view - только GET, @api_view(methods=('POST',)) - другие."""
+    def decorator(view):
+        @require_http_methods(methods)
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            try:
+                return view(request, *args, **kwargs)
+            except BadRequest as error:
+                return error_response(request, str(error))
+            except uploads.UploadError as error:
+                return error_response(
+                    request, str(error), status=error.status
+                )
+            except Http404:
+                return error_response(request, 'Не найдено', status=404)
+        return wrapper
+    if view is not None:
+        return decorator(view)
+    return decorator
+
+
+@api_view
+def index(request):
+    """Лента всех постов"""
+    fields = parse_fields(request)
+    return json_response(
+        request, paginate_cursor(request, Post.objects.visible(), fields)
+    )
+
+
+@api_view
+def group_posts(request, slug):
+    """Посты выбранной группы"""
+    fields = parse_fields(request)
+    group = get_object_or_404(
+        Group.objects.only('title', 'slug', 'description'), slug=slug,
+        is_deleted=False
+    )
+    data = paginate_cursor(
+        request, group.posts.visible(), fields,
+        archive=group.archived_posts.filter(author__is_active=True)
+    )
+    data['group'] = {
+        'title': group.title,
+        'slug': group.slug,
+        'description': group.description,
+    }
+    return json_response(request, data)
+
+
+@api_view
+def profile(request, username):
+    """Посты выбранного автора"""
+    fields = parse_fields(request)
+    author = get_object_or_404(
+        User.objects.only('username', 'first_name', 'last_name'),
+        username=username, is_active=True
+    )
+    data = paginate_cursor(
+        request, author.posts.visible(), fields,
+        archive=author.archived_posts.all()
+    )
+    data['author'] = {
+        'username': author.username,
+        'full_name': author.get_full_name(),
+    }
+    data['following'] = (
+        request.user.is_authenticated
+        and Follow.objects.filter(user=request.user, author=author).exists()
+    )
+    return json_response(request, data)
+
+
+@api_view
+def post_detail(request, post_id):
+    """Выбранный пост, по запросу - с комментариями"""
+    fields = parse_fields(request, allowed=POST_DETAIL_FIELDS)
+    post_fields = [name for name in fields if name != 'comments']
+    post = shape_queryset(Post.objects.visible(), post_fields).filter(
+        pk=post_id
+    ).first()
+    if post is None:
+        post = get_object_or_404(shape_queryset(
+            ArchivedPost.objects.filter(author__is_active=True), post_fields
+        ), pk=post_id)
+    data = serialize_post(post, post_fields)
+    if 'comments' in fields:
+        comments = post.comments.filter(
+            author__is_active=True
+        ).select_related('author').only(
+            'text', 'created', 'author__username'
+        )
+        data['comments'] = [
+            {
+                'author': comment.author.username,
+                'text': comment.text,
+                'created': comment.created,
+            }
+            for comment in comments
+        ]
+    return json_response(request, data)
+
+
+@api_view
+def follow_index(request):
+    """Посты авторов, на которых подписан текущий пользователь"""
+    if not request.user.is_authenticated:
+        return error_response(
+            request, 'Требуется авторизация', status=401
+        )
+    fields = parse_fields(request)
+    posts = Post.objects.visible().filter(
+        author__following__user=request.user
+    )
+    return json_response(request, paginate_cursor(request, posts, fields))
+
+
+def count_new_posts(posts, since):
+    """Сколько постов новее since, не больше NEW_POSTS_CAP.
+
+    Читаем только pk с лимитом, поэтому запрос не выходит за индекс."""
+    return len(
+        posts.filter(pk__gt=since).order_by()
+        .values_list('pk', flat=True)[:settings.NEW_POSTS_CAP]
+    )
+
+
+def parse_int(request, name, default=0):
+    try:
+        return int(request.GET.get(name, default))
+    except ValueError:
+        raise BadRequest(f'Параметр {name} должен быть числом')
+
+
+@api_view
+def new_posts(request):
+    """Проверка новых постов в ленте: всей, группы (?group=) или
+    подписок (?feed=follow). С ?timeout= ждём появления постов
+    (long polling), пока не истечёт таймаут. Всё это время запрос
+    занимает воркер WSGI, поэтому таймаут ограничен POLL_MAX_TIMEOUT."""
+    since = parse_int(request, 'since')
+    timeout = min(
+        max(parse_int(request, 'timeout'), 0), settings.POLL_MAX_TIMEOUT
+    )
+    posts = Post.objects.visible()
+    if request.GET.get('group'):
+        posts = posts.filter(group__slug=request.GET['group'])
+    if request.GET.get('feed') == 'follow':
+        if not request.user.is_authenticated:
+            return error_response(
+                request, 'Требуется авторизация', status=401
+            )
+        posts = posts.filter(author__following__user=request.user)
+    deadline = time.monotonic() + timeout
+    checked = since
+    count = 0
+    while True:
+        latest = latest_post_id()
+        # В базу идём, только если с прошлой проверки появились посты.
+        if latest > checked:
+            count = count_new_posts(posts, since)
+            checked = latest
+        if count or time.monotonic() >= deadline:
+            break
+        time.sleep(settings.POLL_INTERVAL)
+    return json_response(request, {
+        'count': count,
+        'capped': count >= settings.NEW_POSTS_CAP,
+        'latest': checked,
+    })
+
+
+@api_view
+def autocomplete_groups(request):
+    """Группы, у которых название или slug начинается с ?q="""
+    query = request.GET.get('q', '').strip()
+    results = autocomplete.groups.search(query) if query else []
+    return json_response(request, {'results': results})
+
+
+@api_view
+def autocomplete_users(request):
+    """Пользователи, чей username начинается с ?q="""
+    query = request.GET.get('q', '').strip()
+    results = autocomplete.users.search(query) if query else []
+    return json_response(request, {'results': results})
+
+
+def serialize_upload(upload):
+    return {
+        'id': str(upload.pk),
+        'size': upload.size,
+        'offset': upload.received,
+        'status': upload.status,
+    }
+
+
+@api_view(methods=('POST',))
+def upload_create(request):
+    """Начало загрузки картинки: {"filename", "size", "sha256"}"""
+    if not request.user.is_authenticated:
+        return error_response(request, 'Требуется авторизация', status=401)
+    try:
+        data = json.loads(request.body)
+    except ValueError:
+        raise BadRequest('Ожидается JSON')
+    if not isinstance(data, dict):
+        raise BadRequest('Ожидается JSON-объект')
+    upload = uploads.create(
+        request.user, data.get('filename'), data.get('size'),
+        data.get('sha256')
+    )
+    return json_response(request, serialize_upload(upload), status=201)
+
+
+@api_view(methods=('GET', 'PATCH'))
+def upload_detail(request, upload_id):
+    """GET - сколько принято, PATCH - очередная часть файла.
+
+    Смещение части передаётся в заголовке Upload-Offset, тело запроса
+    не буферизуется и пишется в файл по мере чтения."""
+    if not request.user.is_authenticated:
+        return error_response(request, 'Требуется авторизация', status=401)
+    upload = get_object_or_404(
+        ImageUpload, pk=upload_id, user=request.user
+    )
+    if request.method == 'PATCH':
+        try:
+            offset = int(request.META['HTTP_UPLOAD_OFFSET'])
+            length = int(request.META['CONTENT_LENGTH'])
+        except (KeyError, ValueError):
+            raise BadRequest('Нужны заголовки Upload-Offset и Content-Length')
+        uploads.write_chunk(upload, offset, request, length)
+    return json_response(request, serialize_upload(upload))
+
+
+@api_view(methods=('POST',))
+def upload_attach(request, upload_id, post_id):
+    """Прикрепляем загруженную картинку к своему посту"""
+    if not request.user.is_authenticated:
+        return error_response(request, 'Требуется авторизация', status=401)
+    upload = get_object_or_404(
+        ImageUpload, pk=upload_id, user=request.user
+    )
+    post = get_object_or_404(
+        Post.objects.visible(), pk=post_id, author=request.user
+    )
+    uploads.attach(upload, post)
+    return json_response(
+        request, serialize_post(post, ['id', 'image'])
+    )
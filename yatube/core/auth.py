@@ -0,0 +1,93 @@
+from django.conf import settings
+from django.contrib import auth
+from django.contrib.auth.middleware import AuthenticationMiddleware
+from django.contrib.auth.models import AnonymousUser
+from django.contrib.auth.signals import user_logged_out
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils.crypto import constant_time_compare
+from django.utils.functional import SimpleLazyObject
+
+USER_KEY = 'auth:user:{}'
+# Что хранится в кэше о пользователе сессии. Остальные поля, как и у
+# модели из only(), загружаются из базы при первом обращении.
+USER_FIELDS = ('id', 'username', 'is_active', 'is_staff')
+
+
+def snapshot(user):
+    """Значения USER_FIELDS и хэш сессии - без хэша пароля."""
+    return (
+        *(getattr(user, name) for name in USER_FIELDS),
+        user.get_session_auth_hash(),
+    )
+
+
+def load_user(request):
+    """Пользователь сессии: из кэша, при промахе - как в django.contrib.auth.
+
+    Проверки совпадают с auth.get_user: бэкенд из настроек, активность
+    и хэш сессии, который меняется вместе с паролем. Кэш должен быть
+    общим для процессов (core/checks.py): сигналы ниже сбрасывают его
+    при смене пароля, деактивации и выходе."""
+    try:
+        user_id = auth.get_user_model()._meta.pk.to_python(
+            request.session[auth.SESSION_KEY]
+        )
+        backend = request.session[auth.BACKEND_SESSION_KEY]
+    except KeyError:
+        return AnonymousUser()
+    if backend not in settings.AUTHENTICATION_BACKENDS:
+        return AnonymousUser()
+    cached = cache.get(USER_KEY.format(user_id))
+    if cached is None:
+        user = auth.get_user(request)
+        if user.is_authenticated:
+            cache.set(
+                USER_KEY.format(user_id), snapshot(user),
+                settings.AUTH_USER_CACHE_TIMEOUT
+            )
+        return user
+    *values, user_hash = cached
+    session_hash = request.session.get(auth.HASH_SESSION_KEY)
+    is_active = values[USER_FIELDS.index('is_active')]
+    if not is_active or not session_hash or not constant_time_compare(
+        session_hash, user_hash
+    ):
+        request.session.flush()
+        return AnonymousUser()
+    user = auth.get_user_model().from_db(DEFAULT_DB_ALIAS, USER_FIELDS, values)
+    user.backend = backend
+    return user
+
+
+def get_user(request):
+    if not hasattr(request, '_cached_user'):
+        request._cached_user = load_user(request)
+    return request._cached_user
+
+
+class CachedAuthenticationMiddleware(AuthenticationMiddleware):
+    """AuthenticationMiddleware без запроса пользователя к базе на каждой
+    странице: пользователь берётся из кэша до изменения или выхода."""
+
+    def process_request(self, request):
+        request.user = SimpleLazyObject(lambda: get_user(request))
+
+
+def forget_user(user_id):
+    cache.delete(USER_KEY.format(user_id))
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def user_changed(sender, instance, **kwargs):
+    """Смена пароля, правка профиля, удаление - сбрасываем кэш."""
+    forget_user(instance.pk)
+
+
+@receiver(user_logged_out)
+def user_logged_out_handler(sender, request, user, **kwargs):
+    if user is not None:
+        forget_user(user.pk)
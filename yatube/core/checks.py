@@ -0,0 +1,21 @@
+from django.conf import settings
+from django.core.checks import Error, register
+
+# Бэкенды, у которых каждый процесс видит только свои ключи.
+LOCAL_CACHES = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+@register()
+def shared_cache_check(app_configs, **kwargs):
+    """Лимиты частоты, кэш сессий и пользователя сессии требуют кэша,
+    общего для всех процессов сайта."""
+    if settings.CACHES['default']['BACKEND'] in LOCAL_CACHES:
+        return [Error(
+            'Кэш default должен быть общим для всех процессов.',
+            hint='Используйте файловый кэш, Memcached или Redis.',
+            id='core.E001',
+        )]
+    return []
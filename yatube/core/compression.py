@@ -0,0 +1,57 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.middleware.gzip import re_accepts_gzip
+from django.utils.cache import get_max_age, patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+from django.utils.text import compress_string
+
+COMPRESSIBLE_TYPES = ('text/html', 'application/json')
+
+
+def cached_compress(content, timeout):
+    """Сжатое тело из кэша, ключ - хэш исходного тела.
+
+    Страница из cache_page при каждом попадании отдаёт те же байты,
+    поэтому сжимается один раз на заполнение кэша, а не на запрос."""
+    key = 'gzip:' + hashlib.md5(content).hexdigest()
+    compressed = cache.get(key)
+    if compressed is None:
+        compressed = compress_string(content)
+        cache.set(key, compressed, timeout)
+    return compressed
+
+
+class CachedGZipMiddleware(MiddlewareMixin):
+    """GZip для HTML и JSON. Ответы с max-age (cache_page) сжимаются
+    через кэш сжатых тел, остальные - на каждый запрос."""
+
+    def process_response(self, request, response):
+        content_type = response.get('Content-Type', '').split(';')[0]
+        if (
+            response.streaming
+            or content_type not in COMPRESSIBLE_TYPES
+            or response.has_header('Content-Encoding')
+            or len(response.content) < settings.GZIP_MIN_LENGTH
+        ):
+            return response
+        patch_vary_headers(response, ('Accept-Encoding',))
+        if not re_accepts_gzip.search(
+            request.META.get('HTTP_ACCEPT_ENCODING', '')
+        ):
+            return response
+        max_age = get_max_age(response)
+        if max_age:
+            compressed = cached_compress(response.content, max_age)
+        else:
+            compressed = compress_string(response.content)
+        if len(compressed) >= len(response.content):
+            return response
+        response.content = compressed
+        response['Content-Length'] = str(len(compressed))
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        response['Content-Encoding'] = 'gzip'
+        return response
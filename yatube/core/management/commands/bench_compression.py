@@ -0,0 +1,36 @@
+import timeit
+
+from django.core.management.base import BaseCommand
+from django.test import Client
+from django.utils.text import compress_string
+
+from core.compression import cached_compress
+
+
+class Command(BaseCommand):
+    help = ('Сравнивает размер страниц до и после сжатия и время сжатия '
+            'на каждый запрос с чтением сжатого тела из кэша.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('urls', nargs='*', default=['/'])
+        parser.add_argument('--number', type=int, default=200)
+
+    def handle(self, *args, **options):
+        client = Client()
+        number = options['number']
+        for url in options['urls']:
+            raw = client.get(url).content
+            compressed = compress_string(raw)
+            per_hit = timeit.timeit(
+                lambda: compress_string(raw), number=number
+            ) / number
+            cached_compress(raw, 60)
+            cached = timeit.timeit(
+                lambda: cached_compress(raw, 60), number=number
+            ) / number
+            self.stdout.write(
+                f'{url}: {len(raw)} -> {len(compressed)} байт '
+                f'(-{100 - len(compressed) * 100 // len(raw)}%), '
+                f'сжатие {per_hit * 1000:.3f} мс, '
+                f'из кэша {cached * 1000:.3f} мс на запрос'
+            )
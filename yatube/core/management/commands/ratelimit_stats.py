@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from core.ratelimit import rejected_counts
+
+
+class Command(BaseCommand):
+    help = 'Показывает, сколько запросов отклонил ограничитель частоты.'
+
+    def handle(self, *args, **options):
+        for view_name, count in rejected_counts().items():
+            self.stdout.write(f'{view_name}: {count}')
@@ -0,0 +1,113 @@
+import math
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+
+PERIODS = {'s': 1, 'm': 60, 'h': 60 * 60, 'd': 24 * 60 * 60}
+REJECTED_KEY = 'ratelimit:rejected:{}'
+WRITE_METHODS = ('POST', 'PUT', 'PATCH', 'DELETE')
+
+
+def parse_rate(rate):
+    """'10/m' -> (10 запросов, 60 секунд)."""
+    count, period = rate.split('/')
+    return int(count), PERIODS[period]
+
+
+def get_limit(view_name):
+    """Лимит вьюхи: '10/m' для пишущих методов или
+    ('10/m', ('GET',)) с явным списком методов."""
+    limit = settings.RATELIMITS.get(view_name)
+    if isinstance(limit, str):
+        return limit, WRITE_METHODS
+    return limit or (None, ())
+
+
+def take_token(key, rate):
+    """Берём токен из ведра key. Возвращает 0, если запрос разрешён,
+    иначе - сколько секунд ждать.
+
+    Ведро хранится в общем кэше как "теоретическое время прихода"
+    следующего запроса (GCRA, эквивалент token bucket) в миллисекундах
+    и двигается только через incr/decr кэша: в Memcached и Redis они
+    атомарны, в файловом кэше - чтение и запись, и одновременные
+    запросы одного клиента изредка проходят сверх лимита. Каждая запись
+    продлевает жизнь ключа на period: иначе ключ истёк бы посреди
+    ограничения и клиент получил бы новый запас запросов."""
+    burst, period = parse_rate(rate)
+    interval = period * 1000 // burst
+    now = int(time.time() * 1000)
+    cache.add(key, now, period)
+    try:
+        tat = cache.incr(key, interval)
+    except ValueError:
+        tat = now + interval
+        cache.set(key, tat, period)
+    if tat <= now + interval:
+        # Ведро успело наполниться: отсчёт идёт от текущего момента.
+        cache.set(key, now + interval, period)
+        return 0
+    overflow = tat - now - burst * interval
+    if overflow > 0:
+        cache.decr(key, interval)
+    cache.touch(key, period)
+    if overflow > 0:
+        return math.ceil(overflow / 1000)
+    return 0
+
+
+def client_ip(request):
+    return request.META.get('REMOTE_ADDR', '')
+
+
+def count_rejected(view_name):
+    key = REJECTED_KEY.format(view_name)
+    cache.add(key, 0, None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, None)
+
+
+def rejected_counts():
+    """Сколько запросов отклонено по каждой ограниченной вьюхе."""
+    keys = {REJECTED_KEY.format(name): name for name in settings.RATELIMITS}
+    counts = cache.get_many(keys)
+    return {name: counts.get(key, 0) for key, name in keys.items()}
+
+
+class RateLimitMiddleware:
+    """Ограничивает частоту записи во вьюхи из settings.RATELIMITS.
+
+    Проверка идёт до вызова вьюхи и без запросов к базе: пользователь
+    определяется по cookie сессии, а не через request.user."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        return self.get_response(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        view_name = request.resolver_match.view_name
+        rate, methods = get_limit(view_name)
+        if request.method not in methods:
+            return None
+        identities = ['ip:' + client_ip(request)]
+        session_key = request.COOKIES.get(settings.SESSION_COOKIE_NAME)
+        if session_key:
+            identities.append('session:' + session_key)
+        for identity in identities:
+            retry_after = take_token(
+                f'ratelimit:{view_name}:{identity}', rate
+            )
+            if retry_after:
+                count_rejected(view_name)
+                response = HttpResponse(
+                    'Слишком много запросов, попробуйте позже.', status=429
+                )
+                response['Retry-After'] = str(retry_after)
+                return response
+        return None
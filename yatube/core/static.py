@@ -0,0 +1,121 @@
+import json
+import mimetypes
+import os
+import posixpath
+
+from django.conf import settings
+
+IMMUTABLE = 'public, max-age=31536000, immutable'
+REVALIDATE = 'public, max-age=60'
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+CHUNK_SIZE = 64 * 1024
+MANIFEST_NAME = 'staticfiles.json'
+
+
+def parse_accept_encoding(header):
+    """'gzip, br;q=0' -> {'gzip': 1.0, 'br': 0.0}."""
+    weights = {}
+    for part in header.split(','):
+        coding, *params = part.split(';')
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        weight = 1.0
+        for param in params:
+            name, _, value = param.partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        weights[coding] = weight
+    return weights
+
+
+def read_chunks(path):
+    with open(path, 'rb') as file:
+        yield from iter(lambda: file.read(CHUNK_SIZE), b'')
+
+
+class StaticFile:
+    def __init__(self, path, immutable):
+        self.path = path
+        self.content_type = (
+            mimetypes.guess_type(path)[0] or 'application/octet-stream'
+        )
+        self.cache_control = IMMUTABLE if immutable else REVALIDATE
+        self.variants = {
+            encoding: path + suffix
+            for encoding, suffix in ENCODINGS
+            if os.path.isfile(path + suffix)
+        }
+
+    def choose(self, accept_encoding):
+        weights = parse_accept_encoding(accept_encoding)
+        for encoding, path in self.variants.items():
+            if weights.get(encoding, weights.get('*', 0)) > 0:
+                return encoding, path
+        return None, self.path
+
+
+class CompressedStaticMiddleware:
+    """WSGI-обёртка, которая отдаёт собранную статику из STATIC_ROOT
+    до Django: без URL-роутинга и middleware.
+
+    Файлы с хэшем в имени (из манифеста collectstatic) кэшируются
+    браузером навсегда, сжатая копия выбирается по Accept-Encoding.
+    Запоминаются только найденные файлы: их число ограничено
+    содержимым STATIC_ROOT, а промахи с произвольными путями от
+    клиентов память не расходуют."""
+
+    def __init__(self, application):
+        self.application = application
+        self.root = settings.STATIC_ROOT
+        self.prefix = settings.STATIC_URL
+        self.hashed = self.load_hashed_names()
+        self.files = {}
+
+    def load_hashed_names(self):
+        manifest = os.path.join(self.root or '', MANIFEST_NAME)
+        try:
+            with open(manifest) as file:
+                return set(json.load(file)['paths'].values())
+        except (OSError, ValueError, KeyError):
+            return set()
+
+    def find(self, name):
+        static_file = self.files.get(name)
+        if static_file is None and name != MANIFEST_NAME:
+            path = os.path.join(self.root, *name.split('/'))
+            if os.path.isfile(path):
+                static_file = self.files[name] = StaticFile(
+                    path, name in self.hashed
+                )
+        return static_file
+
+    def __call__(self, environ, start_response):
+        path = environ.get('PATH_INFO', '')
+        if not self.root or not path.startswith(self.prefix):
+            return self.application(environ, start_response)
+        name = posixpath.normpath(path[len(self.prefix):]).lstrip('/')
+        static_file = None if name.startswith('..') else self.find(name)
+        if static_file is None:
+            return self.application(environ, start_response)
+        encoding, file_path = static_file.choose(
+            environ.get('HTTP_ACCEPT_ENCODING', '')
+        )
+        headers = [
+            ('Content-Type', static_file.content_type),
+            ('Content-Length', str(os.path.getsize(file_path))),
+            ('Cache-Control', static_file.cache_control),
+            ('Vary', 'Accept-Encoding'),
+        ]
+        if encoding:
+            headers.append(('Content-Encoding', encoding))
+        start_response('200 OK', headers)
+        if environ.get('REQUEST_METHOD') == 'HEAD':
+            return []
+        file_wrapper = environ.get('wsgi.file_wrapper')
+        if file_wrapper:
+            return file_wrapper(open(file_path, 'rb'), CHUNK_SIZE)
+        return read_chunks(file_path)
@@ -0,0 +1,40 @@
+"""Отдельный кэш для тестов.
+
+Кэш сайта файловый и общий для процессов, а тесты вызывают
+cache.clear() и кэшируют страницы. Без подмены они стирали бы лимиты,
+сессии и индексы запущенного сайта и видели бы страницы, закэшированные
+прошлым прогоном. Здесь на время прогона кэш default переезжает во
+временный каталог: для manage.py test - через TEST_RUNNER, для pytest -
+через фикстуру в conftest.py.
+"""
+import copy
+import shutil
+import tempfile
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.test import override_settings
+from django.test.runner import DiscoverRunner
+
+
+@contextmanager
+def temporary_cache():
+    location = tempfile.mkdtemp(prefix='yatube-cache-')
+    caches = copy.deepcopy(settings.CACHES)
+    caches['default']['LOCATION'] = location
+    try:
+        with override_settings(CACHES=caches):
+            yield
+    finally:
+        shutil.rmtree(location, ignore_errors=True)
+
+
+class TemporaryCacheRunner(DiscoverRunner):
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self.cache_stack = ExitStack()
+        self.cache_stack.enter_context(temporary_cache())
+
+    def teardown_test_environment(self, **kwargs):
+        self.cache_stack.close()
+        super().teardown_test_environment(**kwargs)
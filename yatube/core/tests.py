@@ -1,4 +1,23 @@
-from django.test import TestCase
+import gzip
+import json
+import os
+import shutil
+import tempfile
+
+import mock
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from .auth import USER_KEY
+from .checks import shared_cache_check
+from .ratelimit import rejected_counts
+from .static import IMMUTABLE, CompressedStaticMiddleware
+
+User = get_user_model()
 
 
 class ViewTestClass(TestCase):
@@ -8,3 +27,146 @@ class ViewTestClass(TestCase):
             response.status_code, 404, 'статус код страницы не 404'
         )
         self.assertTemplateUsed(response, 'core/404.html')
+
+
+@override_settings(RATELIMITS={'posts:add_comment': '2/m'})
+class RateLimitTest(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_rate_limit(self):
+        """Сверх лимита - 429 с Retry-After и без запросов к базе."""
+        url = reverse('posts:add_comment', kwargs={'post_id': 1})
+        for _ in range(2):
+            self.assertEqual(self.client.post(url).status_code, 302)
+        with self.assertNumQueries(0):
+            response = self.client.post(url)
+        self.assertEqual(response.status_code, 429)
+        self.assertGreater(int(response['Retry-After']), 0)
+        self.assertEqual(self.client.get(url).status_code, 302)
+        self.assertEqual(rejected_counts(), {'posts:add_comment': 1})
+
+
+class SharedCacheCheckTest(TestCase):
+    def test_local_cache_rejected(self):
+        """Кэш отдельного процесса не проходит проверку."""
+        self.assertEqual(shared_cache_check(None), [])
+        local = {'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'
+        }}
+        with override_settings(CACHES=local):
+            errors = shared_cache_check(None)
+        self.assertEqual([error.id for error in errors], ['core.E001'])
+
+
+class CachedAuthenticationTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='auth',
+                                             password='1234567')
+        self.client.force_login(self.user)
+
+    def test_no_auth_queries(self):
+        """Повторный запрос авторизованного пользователя - без запросов
+        к базе за сессией и пользователем."""
+        url = reverse('about:author')
+        self.client.get(url)
+        with self.assertNumQueries(0):
+            response = self.client.get(url)
+        self.assertEqual(response.context['user'], self.user)
+
+    def test_snapshot_without_password(self):
+        """В кэше нет хэша пароля; неактивный пользователь не
+        проходит даже из кэша."""
+        url = reverse('about:author')
+        self.client.get(url)
+        cached = cache.get(USER_KEY.format(self.user.pk))
+        self.assertNotIn(self.user.password, cached)
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        cache.set(
+            USER_KEY.format(self.user.pk),
+            (self.user.pk, 'auth', False, False, cached[-1])
+        )
+        response = self.client.get(url)
+        self.assertFalse(response.context['user'].is_authenticated)
+
+    def test_password_change_invalidates(self):
+        """После смены пароля старая сессия больше не действует."""
+        url = reverse('about:author')
+        self.client.get(url)
+        self.user.set_password('7654321')
+        self.user.save()
+        response = self.client.get(url)
+        self.assertFalse(response.context['user'].is_authenticated)
+
+
+class CompressedStaticTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.static_root = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(cls.static_root, ignore_errors=True)
+
+    def test_collectstatic_and_serving(self):
+        """collectstatic кладёт хэшированные и сжатые файлы, обёртка
+        отдаёт сжатую копию с вечным кэшированием."""
+        with self.settings(STATIC_ROOT=self.static_root):
+            call_command('collectstatic', interactive=False, verbosity=0)
+            with open(os.path.join(self.static_root,
+                                   'staticfiles.json')) as manifest:
+                css = json.load(manifest)['paths']['css/bootstrap.min.css']
+            self.assertTrue(os.path.isfile(
+                os.path.join(self.static_root, css + '.gz')
+            ))
+            middleware = CompressedStaticMiddleware(None)
+        sent = {}
+
+        def start_response(status, headers):
+            sent['status'] = status
+            sent['headers'] = dict(headers)
+
+        body = b''.join(middleware({
+            'PATH_INFO': settings.STATIC_URL + css,
+            'HTTP_ACCEPT_ENCODING': 'gzip, deflate',
+            'REQUEST_METHOD': 'GET',
+        }, start_response))
+        self.assertEqual(sent['headers']['Content-Encoding'], 'gzip')
+        self.assertEqual(sent['headers']['Cache-Control'], IMMUTABLE)
+        self.assertEqual(int(sent['headers']['Content-Length']), len(body))
+        middleware({
+            'PATH_INFO': settings.STATIC_URL + css,
+            'HTTP_ACCEPT_ENCODING': 'br;q=0, gzip;q=0',
+            'REQUEST_METHOD': 'GET',
+        }, start_response)
+        self.assertNotIn('Content-Encoding', sent['headers'])
+        # Манифест и промахи отдаются приложению и не запоминаются.
+        application = mock.Mock(return_value=[])
+        middleware.application = application
+        for name in ('staticfiles.json', 'missing.css'):
+            middleware({'PATH_INFO': settings.STATIC_URL + name,
+                        'REQUEST_METHOD': 'GET'}, start_response)
+        self.assertEqual(application.call_count, 2)
+        self.assertEqual(list(middleware.files), [css])
+
+
+class CachedGZipTest(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    @override_settings(GZIP_MIN_LENGTH=0)
+    def test_cached_page_compressed_once(self):
+        """Страница из cache_page сжимается один раз на заполнение кэша."""
+        url = reverse('posts:index')
+        raw = self.client.get(url).content
+        cache.clear()
+        with mock.patch('core.compression.compress_string',
+                        wraps=gzip.compress) as compress:
+            for _ in range(3):
+                response = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip')
+                self.assertEqual(response['Content-Encoding'], 'gzip')
+                self.assertEqual(gzip.decompress(response.content), raw)
+        self.assertEqual(compress.call_count, 1)
@@ -0,0 +1,50 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from jobs import worker
+
+
+def execute(job):
+    # У каждого потока пула своё соединение с базой.
+    try:
+        return worker.execute(job)
+    finally:
+        close_old_connections()
+
+
+class Command(BaseCommand):
+    help = 'Запускает обработчик фоновых задач.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--threads', type=int, default=4,
+            help='Сколько задач выполнять параллельно.'
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Выполнить готовые задачи и завершиться.'
+        )
+
+    def handle(self, *args, **options):
+        threads = options['threads']
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            while True:
+                worker.requeue_stale()
+                jobs = worker.claim(threads * settings.JOBS_BATCH_SIZE)
+                if jobs:
+                    statuses = list(pool.map(execute, jobs))
+                    self.stdout.write(
+                        f'Выполнено задач: {statuses.count("done")} '
+                        f'из {len(jobs)}'
+                    )
+                    continue
+                # Старые задачи чистим, пока очередь простаивает.
+                if worker.purge_done():
+                    continue
+                if options['once']:
+                    break
+                time.sleep(settings.JOBS_POLL_INTERVAL)
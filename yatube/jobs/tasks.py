@@ -0,0 +1,43 @@
+import json
+from functools import update_wrapper
+
+from .models import Job
+
+
+class Task:
+    """Функция, которую можно выполнить сразу или поставить в очередь."""
+
+    def __init__(self, func, priority=0, max_attempts=3):
+        self.func = func
+        self.name = f'{func.__module__}.{func.__qualname__}'
+        self.priority = priority
+        self.max_attempts = max_attempts
+        update_wrapper(self, func)
+
+    def __call__(self, *args, **kwargs):
+        return self.func(*args, **kwargs)
+
+    def delay(self, *args, priority=None, run_at=None, **kwargs):
+        """Ставим задачу в очередь в текущей транзакции: если
+        транзакция откатится, задача тоже не появится."""
+        job = Job(
+            name=self.name,
+            payload=json.dumps({'args': args, 'kwargs': kwargs}),
+            priority=self.priority if priority is None else priority,
+            max_attempts=self.max_attempts,
+        )
+        if run_at is not None:
+            job.run_at = run_at
+        job.save()
+        return job
+
+
+def task(func=None, *, priority=0, max_attempts=3):
+    """Декоратор фоновой задачи: @task или @task(priority=10).
+
+    Аргументы задачи должны сериализоваться в JSON."""
+    def decorator(func):
+        return Task(func, priority=priority, max_attempts=max_attempts)
+    if func is not None:
+        return decorator(func)
+    return decorator
@@ -0,0 +1,100 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+
+from . import worker
+from .models import Job
+from .tasks import task
+
+calls = []
+
+
+@task
+def record(value):
+    calls.append(value)
+
+
+@task(max_attempts=2)
+def fail():
+    raise ValueError('Ошибка задачи')
+
+
+class JobQueueTest(TestCase):
+    def setUp(self):
+        calls.clear()
+
+    def test_delay_and_run(self):
+        """Задачи выполняются по приоритету, вызов без delay - сразу."""
+        record('сразу')
+        self.assertEqual(calls, ['сразу'])
+        calls.clear()
+        record.delay('обычная')
+        record.delay('срочная', priority=10)
+        record.delay('отложенная',
+                     run_at=timezone.now() + timedelta(hours=1))
+        self.assertEqual(worker.run_pending(), 2)
+        self.assertEqual(calls, ['срочная', 'обычная'])
+        self.assertEqual(Job.objects.filter(status=Job.DONE).count(), 2)
+
+    def test_retry_with_backoff(self):
+        """Упавшая задача повторяется позже, затем помечается ошибкой."""
+        job = fail.delay()
+        worker.run_pending()
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.PENDING)
+        self.assertGreater(job.run_at, timezone.now())
+        self.assertIn('Ошибка задачи', job.last_error)
+        Job.objects.update(run_at=timezone.now())
+        worker.run_pending()
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.FAILED)
+
+    def test_requeue_stale(self):
+        """Задача упавшего воркера возвращается в очередь, пока у неё
+        есть попытки."""
+        retry = record.delay('повтор')
+        exhausted = record.delay('хватит')
+        worker.claim(10)
+        Job.objects.filter(pk=exhausted.pk).update(attempts=3)
+        Job.objects.update(run_at=timezone.now() - timedelta(days=1))
+        self.assertEqual(worker.requeue_stale(), 1)
+        retry.refresh_from_db()
+        exhausted.refresh_from_db()
+        self.assertEqual(retry.status, Job.PENDING)
+        self.assertEqual(exhausted.status, Job.FAILED)
+
+    def test_purge_done(self):
+        """Старые выполненные задачи удаляются, ошибочные остаются."""
+        old = record.delay('старая')
+        record.delay('свежая')
+        worker.run_pending()
+        Job.objects.create(name=fail.name, status=Job.FAILED)
+        Job.objects.exclude(pk__gt=old.pk).update(
+            run_at=timezone.now() - timedelta(days=2)
+        )
+        Job.objects.filter(status=Job.FAILED).update(
+            run_at=timezone.now() - timedelta(days=2)
+        )
+        self.assertEqual(worker.purge_done(), 1)
+        self.assertFalse(Job.objects.filter(pk=old.pk).exists())
+        self.assertEqual(
+            sorted(Job.objects.values_list('status', flat=True)),
+            [Job.DONE, Job.FAILED]
+        )
+
+    def test_claim_once(self):
+        record.delay('одна')
+        self.assertEqual(len(worker.claim(10)), 1)
+        self.assertEqual(worker.claim(10), [])
+
+
+class RunWorkerTest(TransactionTestCase):
+    def test_run_worker_command(self):
+        """Воркер выполняет задачи в пуле потоков."""
+        calls.clear()
+        record.delay('из команды')
+        call_command('run_worker', once=True, threads=1, stdout=StringIO())
+        self.assertEqual(calls, ['из команды'])
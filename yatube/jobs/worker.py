@@ -0,0 +1,93 @@
+import json
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import Job
+
+
+def claim(limit):
+    """Забираем из очереди до limit готовых задач.
+
+    Задача достаётся тому воркеру, чей UPDATE сменил её статус, поэтому
+    несколько воркеров не выполнят одну задачу дважды."""
+    now = timezone.now()
+    candidates = Job.objects.filter(
+        status=Job.PENDING, run_at__lte=now
+    ).values_list('pk', flat=True)[:limit]
+    claimed = []
+    for pk in list(candidates):
+        updated = Job.objects.filter(pk=pk, status=Job.PENDING).update(
+            status=Job.RUNNING, attempts=F('attempts') + 1, run_at=now
+        )
+        if updated:
+            claimed.append(pk)
+    return list(Job.objects.filter(pk__in=claimed))
+
+
+def backoff(attempts):
+    return timedelta(seconds=settings.JOBS_RETRY_DELAY * 2 ** (attempts - 1))
+
+
+def execute(job):
+    """Выполняем задачу; при ошибке - повтор с экспоненциальной паузой,
+    пока не кончатся попытки."""
+    try:
+        payload = json.loads(job.payload)
+        import_string(job.name)(*payload['args'], **payload['kwargs'])
+    except Exception:
+        job.last_error = traceback.format_exc()
+        if job.attempts >= job.max_attempts:
+            job.status = Job.FAILED
+        else:
+            job.status = Job.PENDING
+            job.run_at = timezone.now() + backoff(job.attempts)
+    else:
+        job.status = Job.DONE
+    job.save(update_fields=['status', 'run_at', 'last_error'])
+    return job.status
+
+
+def requeue_stale():
+    """Возвращаем в очередь задачи упавших воркеров. Задача, у которой
+    кончились попытки, считается ошибочной: иначе задача, роняющая
+    воркер, возвращалась бы в очередь бесконечно."""
+    stale = Job.objects.filter(
+        status=Job.RUNNING,
+        run_at__lt=timezone.now() - timedelta(
+            seconds=settings.JOBS_STALE_AFTER
+        )
+    )
+    stale.filter(attempts__gte=F('max_attempts')).update(
+        status=Job.FAILED, last_error='Воркер не завершил задачу'
+    )
+    return stale.update(status=Job.PENDING)
+
+
+def purge_done():
+    """Удаляем пачку выполненных задач старше JOBS_KEEP_DONE, чтобы
+    таблица очереди не росла без предела. Ошибочные задачи остаются
+    для разбора."""
+    cutoff = timezone.now() - timedelta(seconds=settings.JOBS_KEEP_DONE)
+    pks = list(
+        Job.objects.filter(status=Job.DONE, run_at__lt=cutoff)
+        .values_list('pk', flat=True)[:settings.JOBS_PURGE_BATCH_SIZE]
+    )
+    return Job.objects.filter(pk__in=pks).delete()[0] if pks else 0
+
+
+def run_pending(limit=100):
+    """Выполняем готовые задачи в текущем потоке, пока они есть."""
+    done = 0
+    while done < limit:
+        jobs = claim(min(settings.JOBS_BATCH_SIZE, limit - done))
+        if not jobs:
+            break
+        for job in jobs:
+            execute(job)
+        done += len(jobs)
+    return done
@@ -1,19 +1,162 @@
+from django import forms
+from django.conf import settings
 from django.contrib import admin
+from django.contrib.admin.views.main import PAGE_VAR
+from django.contrib.admin.widgets import AutocompleteSelect
+from django.contrib.auth.admin import UserAdmin
+from django.core.paginator import Paginator
+from django.db import connection
+from django.utils.functional import cached_property
 
-from .models import Group, Post, Comment, Follow
+from . import deletion
+from .models import Group, Post, Comment, Follow, Deletion, User
+
+
+def estimated_count(queryset):
+    """Оценка числа строк таблицы без COUNT(*) по всей таблице или
+    None, если статистики нет."""
+    table = queryset.model._meta.db_table
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute(
+                'SELECT reltuples::bigint FROM pg_class WHERE relname = %s',
+                [table]
+            )
+            row = cursor.fetchone()
+            return row[0] if row and row[0] > 0 else None
+        if connection.vendor != 'sqlite':
+            return None
+        # Статистику SQLite собирает ANALYZE (его запускает и
+        # archive_posts); первое число stat - строк в таблице.
+        cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'"
+        )
+        if cursor.fetchone() is None:
+            return None
+        cursor.execute('SELECT stat FROM sqlite_stat1 WHERE tbl = %s',
+                       [table])
+        row = cursor.fetchone()
+    return int(row[0].split()[0]) if row else None
+
+
+class EstimatedCountPaginator(Paginator):
+    """Пагинатор списка в админке для больших таблиц: без фильтров
+    число строк оценивается, с фильтрами - считается до предела.
+
+    Неточное число не обрезает список: если запрошенная страница
+    (page_number) упирается в оценку или предел, строки дочитываются
+    до её конца и ещё одной - ссылка на следующую страницу есть, пока
+    есть строки."""
+
+    def __init__(self, *args, page_number=1, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.page_number = page_number
+
+    @cached_property
+    def count(self):
+        limit = settings.ADMIN_EXACT_COUNT_LIMIT
+        queryset = self.object_list
+        rows = queryset.order_by().values('pk')
+        count = None
+        if not queryset.query.where:
+            count = estimated_count(queryset)
+        if count is None or count <= limit:
+            count = rows[:limit].count()
+            if count < limit:
+                return count
+        bottom = (self.page_number - 1) * self.per_page
+        if bottom + self.per_page < count:
+            return count
+        return bottom + rows[bottom:bottom + self.per_page + 1].count()
+
+
+class PreloadedAutocompleteSelect(AutocompleteSelect):
+    """Автодополнение, которое не перечитывает выбранный объект, если он
+    уже загружен вместе со строкой списка (list_select_related)."""
+    preloaded = None
+
+    def optgroups(self, name, value, attr=None):
+        obj = self.preloaded
+        if obj is None or [str(obj.pk)] != [str(item) for item in value]:
+            return super().optgroups(name, value, attr)
+        options = [] if self.is_required else [
+            self.create_option(name, '', '', False, 0)
+        ]
+        options.append(self.create_option(
+            name, obj.pk, self.choices.field.label_from_instance(obj),
+            True, len(options)
+        ))
+        return [(None, options, 0)]
+
+
+class PostChangeListForm(forms.ModelForm):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        widget = self.fields['group'].widget
+        # В админке виджет обёрнут RelatedFieldWidgetWrapper.
+        getattr(widget, 'widget', widget).preloaded = self.instance.group
+
+
+class PerformanceModelAdmin(admin.ModelAdmin):
+    """Список без N+1 запросов и полных COUNT(*)."""
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def get_paginator(self, request, queryset, per_page, orphans=0,
+                      allow_empty_first_page=True):
+        try:
+            page_number = int(request.GET.get(PAGE_VAR, 0)) + 1
+        except ValueError:
+            page_number = 1
+        return self.paginator(queryset, per_page, orphans,
+                              allow_empty_first_page,
+                              page_number=max(page_number, 1))
+
+
+class BackgroundDeleteMixin:
+    """Удаление из админки через фоновую задачу (deletion.py): объект
+    сразу скрывается, а страница подтверждения не собирает весь каскад
+    связанных строк."""
+
+    def get_deleted_objects(self, objs, request):
+        perms_needed = set()
+        if not self.has_delete_permission(request):
+            perms_needed.add(self.opts.verbose_name)
+        return [str(obj) for obj in objs], {}, perms_needed, []
+
+    def delete_model(self, request, obj):
+        deletion.schedule(obj)
+
+    def delete_queryset(self, request, queryset):
+        for obj in queryset:
+            deletion.schedule(obj)
 
 
 @admin.register(Post)
-class PostAdmin(admin.ModelAdmin):
+class PostAdmin(BackgroundDeleteMixin, PerformanceModelAdmin):
     list_display = ('pk', 'text', 'pub_date', 'author', 'group', 'image')
     list_editable = ('group',)
+    list_select_related = ('author', 'group')
+    autocomplete_fields = ('author', 'group')
     search_fields = ('text',)
     list_filter = ('pub_date',)
     empty_value_display = '-пусто-'
 
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        if db_field.name == 'group':
+            kwargs['widget'] = PreloadedAutocompleteSelect(
+                db_field.remote_field, self.admin_site,
+                using=kwargs.get('using')
+            )
+        return super().formfield_for_foreignkey(db_field, request, **kwargs)
+
+    def get_changelist_form(self, request, **kwargs):
+        kwargs.setdefault('form', PostChangeListForm)
+        return super().get_changelist_form(request, **kwargs)
+
 
 @admin.register(Group)
-class GroupAdmin(admin.ModelAdmin):
+class GroupAdmin(BackgroundDeleteMixin, admin.ModelAdmin):
     list_display = ('title', 'slug', 'description')
     search_fields = ('title',)
     prepopulated_fields = {'slug': ('title',)}
@@ -21,9 +164,12 @@ class GroupAdmin(admin.ModelAdmin):
 
 
 @admin.register(Comment)
-class CommentAdmin(admin.ModelAdmin):
+class CommentAdmin(PerformanceModelAdmin):
     list_display = ('post', 'author', 'text', 'created')
+    list_select_related = ('post', 'author')
+    autocomplete_fields = ('post', 'author')
     search_fields = ('text',)
+    list_filter = ('created',)
     empty_value_display = '-пусто-'
 
 
@@ -31,3 +177,29 @@ class CommentAdmin(admin.ModelAdmin):
 class FollowAdmin(admin.ModelAdmin):
     list_display = ('user', 'author')
     empty_value_display = '-пусто-'
+
+
+admin.site.unregister(User)
+
+
+@admin.register(User)
+class BackgroundDeleteUserAdmin(BackgroundDeleteMixin, UserAdmin):
+    pass
+
+
+@admin.register(Deletion)
+class DeletionAdmin(admin.ModelAdmin):
+    list_display = ('kind', 'name', 'status', 'progress_display',
+                    'created', 'finished')
+    list_filter = ('status', 'kind')
+    readonly_fields = ('kind', 'object_id', 'name', 'status', 'total',
+                       'processed', 'progress_display', 'created',
+                       'finished')
+    empty_value_display = '-пусто-'
+
+    def progress_display(self, obj):
+        return f'{obj.progress}% ({obj.processed} из {obj.total})'
+    progress_display.short_description = 'Прогресс'
+
+    def has_add_permission(self, request):
+        return False
@@ -0,0 +1,92 @@
+"""Перенос старых постов в архивные таблицы.
+
+Горячая таблица Post остаётся маленькой: ленты, индексы и бэкапы не
+платят за годы постов, до которых никто не листает. Страницы автора и
+группы, как и страница поста, дочитывают архив сами (utils.py).
+
+Вместе с постом переносятся комментарии, хэштеги, упоминания, лайки и
+дневные просмотры. Рейтинг TrendingScore не переносится: он затухает
+за часы, и у поста старше ARCHIVE_AFTER_DAYS давно ниже порога.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import (ArchivedComment, ArchivedLike, ArchivedPost,
+                     ArchivedPostMention, ArchivedPostTag,
+                     ArchivedPostViewDaily, Comment, Like, Post, PostMention,
+                     PostTag, PostViewDaily)
+from .utils import bump_archive_version, delete_comments
+
+# Строки, ссылающиеся на пост: (горячая модель, архивная, поля).
+RELATED = (
+    (PostTag, ArchivedPostTag, ('tag', 'pub_date')),
+    (PostMention, ArchivedPostMention, ('user_id', 'pub_date')),
+    (Like, ArchivedLike, ('user_id', 'created')),
+    (PostViewDaily, ArchivedPostViewDaily, ('day', 'views')),
+)
+
+
+def horizon(days=None):
+    """Посты старше этой даты считаются холодными."""
+    if days is None:
+        days = settings.ARCHIVE_AFTER_DAYS
+    return timezone.now() - timedelta(days=days)
+
+
+def archive_batch(cutoff, size):
+    """Переносим до size самых старых постов вместе с комментариями
+    одной короткой транзакцией. Возвращает число перенесённых постов."""
+    with transaction.atomic():
+        posts = list(
+            Post.objects.filter(pub_date__lt=cutoff, is_deleted=False)
+            .order_by('pub_date')[:size]
+        )
+        if not posts:
+            return 0
+        ArchivedPost.objects.bulk_create(
+            ArchivedPost(
+                id=post.pk,
+                text=post.text,
+                text_html=post.text_html,
+                text_html_version=post.text_html_version,
+                excerpt=post.excerpt,
+                excerpt_html=post.excerpt_html,
+                has_more=post.has_more,
+                pub_date=post.pub_date,
+                author_id=post.author_id,
+                group_id=post.group_id,
+                image=post.image.name,
+                image_color=post.image_color,
+                image_preview=post.image_preview,
+                comment_count=post.comment_count,
+                like_count=post.like_count,
+                last_comment_at=post.last_comment_at,
+            )
+            for post in posts
+        )
+        ArchivedComment.objects.bulk_create(
+            ArchivedComment(
+                id=comment.pk,
+                post_id=comment.post_id,
+                author_id=comment.author_id,
+                text=comment.text,
+                text_html=comment.text_html,
+                text_html_version=comment.text_html_version,
+                created=comment.created,
+            )
+            for comment in Comment.objects.filter(post__in=posts).iterator()
+        )
+        for model, archived, fields in RELATED:
+            archived.objects.bulk_create(
+                archived(post_id=row.post_id, **{
+                    field: getattr(row, field) for field in fields
+                })
+                for row in model.objects.filter(post__in=posts).iterator()
+            )
+        delete_comments(Comment.objects.filter(post__in=posts))
+        Post.objects.filter(pk__in=[post.pk for post in posts]).delete()
+    bump_archive_version()
+    return len(posts)
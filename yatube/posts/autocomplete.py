@@ -0,0 +1,92 @@
+import uuid
+from bisect import bisect_left
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import Group, User
+
+
+class PrefixIndex:
+    """Отсортированные ключи и бинарный поиск по префиксу."""
+
+    def __init__(self, entries):
+        entries = sorted(entries, key=lambda entry: entry[0])
+        self.keys = [key for key, _ in entries]
+        self.values = [value for _, value in entries]
+
+    def search(self, prefix, limit):
+        prefix = prefix.lower()
+        results = []
+        seen = set()
+        index = bisect_left(self.keys, prefix)
+        while (
+            index < len(self.keys) and len(results) < limit
+            and self.keys[index].startswith(prefix)
+        ):
+            value = self.values[index]
+            if value['id'] not in seen:
+                seen.add(value['id'])
+                results.append(value)
+            index += 1
+        return results
+
+
+def group_entries():
+    groups = Group.objects.filter(is_deleted=False).values_list(
+        'pk', 'title', 'slug'
+    )
+    for pk, title, slug in groups.iterator():
+        value = {'id': pk, 'title': title, 'slug': slug}
+        yield title.lower(), value
+        yield slug.lower(), value
+
+
+def user_entries():
+    users = User.objects.filter(is_active=True).values_list(
+        'pk', 'username', 'first_name', 'last_name'
+    )
+    for pk, username, first_name, last_name in users.iterator():
+        value = {
+            'id': pk,
+            'username': username,
+            'full_name': f'{first_name} {last_name}'.strip(),
+        }
+        yield username.lower(), value
+
+
+class AutocompleteSource:
+    """Индекс в памяти процесса, перестраивается, когда в общем кэше
+    меняется версия - её сбрасывают сигналы сохранения моделей.
+
+    Версия видна другим процессам, только если кэш default общий для
+    них (файловый, Memcached, Redis - см. core/checks.py): с LocMem
+    остальные воркеры так и жили бы со старым индексом."""
+
+    def __init__(self, name, load_entries):
+        self.version_key = f'autocomplete:version:{name}'
+        self.load_entries = load_entries
+        self.state = (None, None)
+
+    def invalidate(self):
+        cache.set(self.version_key, uuid.uuid4().hex, None)
+
+    def index(self):
+        version = cache.get(self.version_key)
+        if version is None:
+            self.invalidate()
+            version = cache.get(self.version_key)
+        built_version, index = self.state
+        if index is None or built_version != version:
+            index = PrefixIndex(self.load_entries())
+            self.state = (version, index)
+        return index
+
+    def search(self, prefix, limit=None):
+        return self.index().search(
+            prefix, limit or settings.AUTOCOMPLETE_LIMIT
+        )
+
+
+groups = AutocompleteSource('groups', group_entries)
+users = AutocompleteSource('users', user_entries)
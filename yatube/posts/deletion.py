@@ -0,0 +1,161 @@
+"""Фоновое каскадное удаление.
+
+Удаление автора с тысячами постов или большой группы одним запросом
+держит блокировку SQLite секундами. Поэтому объект сразу помечается
+удалённым и пропадает из лент, а зависимые строки удаляются пачками
+по DELETION_BATCH_SIZE: задача обрабатывает одну пачку и ставит себя
+в очередь снова, пока строки не кончатся. У каждой зависимой таблицы
+есть своя стадия, чтобы финальный obj.delete() уже ничего не
+каскадировал.
+"""
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from jobs.tasks import task
+from . import likes, uploads
+from .models import (ArchivedComment, ArchivedLike, ArchivedPost,
+                     ArchivedPostMention, ArchivedPostTag,
+                     ArchivedPostViewDaily, Comment, Deletion, Follow,
+                     FollowSuggestion, Group, ImageUpload, Like, Post,
+                     PostMention, PostTag, PostViewDaily, TrendingScore,
+                     User)
+from .utils import delete_comments
+
+MODELS = {Deletion.POST: Post, Deletion.GROUP: Group, Deletion.USER: User}
+
+
+def stages(kind, obj):
+    """Зависимые строки в порядке удаления: пары (queryset, значения
+    для update или None для delete). Комментарии удаляются раньше
+    постов, чтобы каскад от поста оставался маленьким."""
+    if kind == Deletion.POST:
+        return [
+            (Comment.objects.filter(post=obj), None),
+            (Like.objects.filter(post=obj), None),
+            (PostTag.objects.filter(post=obj), None),
+            (PostMention.objects.filter(post=obj), None),
+            (PostViewDaily.objects.filter(post=obj), None),
+            (TrendingScore.objects.filter(post=obj), None),
+            (ImageUpload.objects.filter(post=obj), {'post': None}),
+        ]
+    if kind == Deletion.GROUP:
+        return [
+            (Post.objects.filter(group=obj), {'group': None}),
+            (ArchivedPost.objects.filter(group=obj), {'group': None}),
+        ]
+    return [
+        (Comment.objects.filter(post__author=obj), None),
+        (Comment.objects.filter(author=obj), None),
+        (Follow.objects.filter(user=obj), None),
+        (Follow.objects.filter(author=obj), None),
+        (FollowSuggestion.objects.filter(user=obj), None),
+        (FollowSuggestion.objects.filter(suggested=obj), None),
+        (Like.objects.filter(post__author=obj), None),
+        (Like.objects.filter(user=obj), None),
+        (PostTag.objects.filter(post__author=obj), None),
+        (PostMention.objects.filter(post__author=obj), None),
+        (PostMention.objects.filter(user=obj), None),
+        (PostViewDaily.objects.filter(post__author=obj), None),
+        (TrendingScore.objects.filter(post__author=obj), None),
+        (ImageUpload.objects.filter(user=obj), None),
+        (Post.objects.filter(author=obj), None),
+        (ArchivedComment.objects.filter(post__author=obj), None),
+        (ArchivedComment.objects.filter(author=obj), None),
+        (ArchivedLike.objects.filter(post__author=obj), None),
+        (ArchivedLike.objects.filter(user=obj), None),
+        (ArchivedPostTag.objects.filter(post__author=obj), None),
+        (ArchivedPostMention.objects.filter(post__author=obj), None),
+        (ArchivedPostMention.objects.filter(user=obj), None),
+        (ArchivedPostViewDaily.objects.filter(post__author=obj), None),
+        (ArchivedPost.objects.filter(author=obj), None),
+    ]
+
+
+def kind_of(obj):
+    for kind, model in MODELS.items():
+        if isinstance(obj, model):
+            return kind
+    raise TypeError(f'Фоновое удаление не поддерживается: {obj!r}')
+
+
+def schedule(obj):
+    """Скрываем объект и ставим удаление в очередь. Запрос только
+    помечает объект: строки считает первый запуск purge."""
+    kind = kind_of(obj)
+    with transaction.atomic():
+        if kind == Deletion.USER:
+            obj.is_active = False
+            obj.save(update_fields=['is_active'])
+        else:
+            obj.is_deleted = True
+            obj.save(update_fields=['is_deleted'])
+        deletion = Deletion.objects.create(
+            kind=kind,
+            object_id=obj.pk,
+            name=str(obj)[:200],
+        )
+        purge.delay(deletion.pk)
+    return deletion
+
+
+def run_batch(queryset, values):
+    pks = list(queryset.order_by().values_list('pk', flat=True)[
+        :settings.DELETION_BATCH_SIZE
+    ])
+    if pks:
+        batch = queryset.model.objects.filter(pk__in=pks)
+        if queryset.model is Comment:
+            delete_comments(batch)
+        elif queryset.model is ImageUpload and values is None:
+            uploads.discard(batch)
+        elif queryset.model is Like:
+            # Счётчики лайков чужих постов догоняют удаление.
+            post_ids = set(batch.values_list('post_id', flat=True))
+            batch.delete()
+            for post_id in post_ids:
+                likes.schedule_flush(post_id)
+        elif values is None:
+            batch.delete()
+        else:
+            batch.update(**values)
+    return len(pks)
+
+
+@task(priority=-10)
+def purge(deletion_id):
+    """Одна пачка удаления; следующая - отдельной задачей, чтобы
+    между пачками успевали пройти другие запросы к базе."""
+    with transaction.atomic():
+        deletion = Deletion.objects.select_for_update().get(pk=deletion_id)
+        if deletion.status == Deletion.DONE:
+            return
+        obj = MODELS[deletion.kind].objects.filter(
+            pk=deletion.object_id
+        ).first()
+        done = obj is None
+        if obj is not None and not deletion.total:
+            # Первый запуск только считает строки для прогресса.
+            deletion.total = sum(
+                queryset.count()
+                for queryset, _ in stages(deletion.kind, obj)
+            ) + 1
+            deletion.save(update_fields=['total'])
+            purge.delay(deletion_id)
+            return
+        if obj is not None:
+            for queryset, values in stages(deletion.kind, obj):
+                processed = run_batch(queryset, values)
+                if processed:
+                    break
+            else:
+                obj.delete()
+                processed = 1
+                done = True
+            deletion.processed += processed
+        if done:
+            deletion.status = Deletion.DONE
+            deletion.finished = timezone.now()
+        deletion.save()
+        if deletion.status != Deletion.DONE:
+            purge.delay(deletion_id)
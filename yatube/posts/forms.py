@@ -1,12 +1,23 @@
 from django import forms
 
-from .models import Post, Comment
+from .models import Comment, Group, Post
+from .widgets import AutocompleteSelect
 
 
 class PostForm(forms.ModelForm):
     class Meta:
         model = Post
         fields = ['text', 'group', 'image']
+        widgets = {
+            'group': AutocompleteSelect('api:autocomplete_groups'),
+        }
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Удалённая группа пропадает сразу, а не после фоновой очистки.
+        self.fields['group'].queryset = Group.objects.filter(
+            is_deleted=False
+        )
 
 
 class CommentForm(forms.ModelForm):
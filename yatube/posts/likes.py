@@ -0,0 +1,57 @@
+"""Лайки постов.
+
+Сам лайк - строка Like с уникальной парой (пользователь, пост). Счётчик
+в Post.like_count не увеличивается на каждый лайк: это была бы запись в
+одну и ту же строку на каждый клик по популярному посту. Первый лайк
+или отмена за окно LIKES_FLUSH_DELAY ставит отложенную задачу, которая
+одним UPDATE пересчитывает счётчик по таблице лайков; остальные клики
+в этом окне задачу не ставят. Поэтому счётчик приблизительный и
+догоняет реальное число с задержкой. Рейтинг популярных постов
+(trending.py) лайк пополняет сразу, с весом LIKE_WEIGHT.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from jobs.tasks import task
+from . import trending
+from .models import Like, Post
+
+FLUSH_KEY = 'likes:flush:{}'
+
+
+@task
+def flush_like_count(post_id):
+    likes = Like.objects.filter(
+        post=OuterRef('pk')
+    ).order_by().values('post').annotate(count=Count('pk')).values('count')
+    Post.objects.filter(pk=post_id).update(
+        like_count=Coalesce(Subquery(likes), 0)
+    )
+
+
+def schedule_flush(post_id):
+    delay = settings.LIKES_FLUSH_DELAY
+    if cache.add(FLUSH_KEY.format(post_id), True, delay):
+        flush_like_count.delay(
+            post_id, run_at=timezone.now() + timedelta(seconds=delay)
+        )
+
+
+def like(user, post):
+    row, created = Like.objects.get_or_create(user=user, post=post)
+    if created:
+        schedule_flush(post.pk)
+        trending.register_engagement(
+            post.pk, trending.LIKE_WEIGHT, when=row.created
+        )
+
+
+def unlike(user, post):
+    deleted, _ = Like.objects.filter(user=user, post=post).delete()
+    if deleted:
+        schedule_flush(post.pk)
@@ -0,0 +1,83 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import Http404
+
+from .models import Group, User
+
+MISSING = 'missing'
+
+
+class LookupCache:
+    """Поиск объекта по уникальному полю через два уровня кэша:
+    небольшой LRU в памяти процесса и общий кэш Django.
+
+    Отсутствующие значения тоже кэшируются, чтобы поток 404 от
+    краулеров не доходил до базы. Общий кэш и LRU своего процесса
+    сбрасываются сигналами моделей, LRU других процессов устаревает
+    не позже чем через LOOKUP_LOCAL_TTL секунд. Это верно, только если
+    кэш default общий для процессов (core/checks.py): с LocMem другие
+    воркеры отдавали бы старые объекты до LOOKUP_CACHE_TIMEOUT.
+
+    Читаются и кэшируются только колонки fields, нужные страницам:
+    хэш пароля и почта пользователя в кэш не попадают."""
+
+    def __init__(self, model, field, fields, **filters):
+        self.model = model
+        self.field = field
+        self.fields = fields
+        self.filters = filters
+        self.prefix = f'lookup:{model._meta.label_lower}:{field}:'
+        self.local = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get_local(self, value):
+        with self.lock:
+            entry = self.local.get(value)
+            if entry is None or entry[1] < time.monotonic():
+                return None
+            self.local.move_to_end(value)
+            return entry[0]
+
+    def set_local(self, value, obj):
+        with self.lock:
+            expires = time.monotonic() + settings.LOOKUP_LOCAL_TTL
+            self.local[value] = (obj, expires)
+            self.local.move_to_end(value)
+            while len(self.local) > settings.LOOKUP_LOCAL_SIZE:
+                self.local.popitem(last=False)
+
+    def get_or_404(self, value):
+        obj = self.get_local(value)
+        if obj is None:
+            obj = cache.get(self.prefix + value)
+            if obj is None:
+                obj = self.model.objects.filter(
+                    **self.filters, **{self.field: value}
+                ).only(*self.fields).first() or MISSING
+                cache.set(
+                    self.prefix + value, obj,
+                    settings.LOOKUP_NEGATIVE_TIMEOUT if obj == MISSING
+                    else settings.LOOKUP_CACHE_TIMEOUT
+                )
+            self.set_local(value, obj)
+        if obj == MISSING:
+            raise Http404(f'{self.model._meta.verbose_name} не найден')
+        return obj
+
+    def invalidate(self, value):
+        cache.delete(self.prefix + value)
+        with self.lock:
+            self.local.pop(value, None)
+
+
+groups = LookupCache(
+    Group, 'slug', ('id', 'title', 'slug', 'description'), is_deleted=False
+)
+users = LookupCache(
+    User, 'username', ('id', 'username', 'first_name', 'last_name'),
+    is_active=True
+)
@@ -0,0 +1,43 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from posts.archive import archive_batch, horizon
+from posts.models import Post
+
+
+class Command(BaseCommand):
+    help = ('Переносит посты старше ARCHIVE_AFTER_DAYS в архив '
+            'небольшими пачками.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=settings.ARCHIVE_AFTER_DAYS,
+            help='Возраст поста в днях, после которого он уходит в архив'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=settings.ARCHIVE_BATCH_SIZE,
+            help='Сколько постов переносить за одну транзакцию'
+        )
+        parser.add_argument(
+            '--max-batches', type=int, default=None,
+            help='Остановиться после стольких пачек; повторный запуск '
+                 'продолжит с того же места'
+        )
+
+    def handle(self, *args, **options):
+        cutoff = horizon(options['days'])
+        archived = batches = 0
+        while options['max_batches'] is None or (
+            batches < options['max_batches']
+        ):
+            count = archive_batch(cutoff, options['batch_size'])
+            if not count:
+                break
+            archived += count
+            batches += 1
+        if archived and connection.vendor == 'sqlite':
+            # Оценка числа строк в админке читает статистику ANALYZE.
+            with connection.cursor() as cursor:
+                cursor.execute(f'ANALYZE {Post._meta.db_table}')
+        self.stdout.write(f'Перенесено в архив постов: {archived}')
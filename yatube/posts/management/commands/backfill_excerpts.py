@@ -0,0 +1,47 @@
+from django.core.management.base import BaseCommand
+
+from posts import markup
+from posts.models import ArchivedPost, Post, make_excerpt
+
+
+class Command(BaseCommand):
+    help = ('Заполняет начало текста постов для лент: для постов, '
+            'созданных без save() (bulk_create, старые данные), или для '
+            'всех после смены EXCERPT_LENGTH.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all', action='store_true',
+            help='Пересчитать все посты, а не только пустые'
+        )
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        for model in (Post, ArchivedPost):
+            updated = self.backfill(model, options)
+            self.stdout.write(
+                f'{model._meta.object_name}: обновлено {updated}'
+            )
+
+    def backfill(self, model, options):
+        posts = model.objects.order_by('pk')
+        if not options['all']:
+            posts = posts.filter(excerpt='').exclude(text='')
+        updated = 0
+        last_pk = 0
+        while True:
+            batch = list(
+                posts.filter(pk__gt=last_pk).only('text')[
+                    :options['batch_size']
+                ]
+            )
+            if not batch:
+                return updated
+            for post in batch:
+                post.excerpt, post.has_more = make_excerpt(post.text)
+                post.excerpt_html = markup.render(post.excerpt)
+            model.objects.bulk_update(
+                batch, ['excerpt', 'has_more', 'excerpt_html']
+            )
+            updated += len(batch)
+            last_pk = batch[-1].pk
@@ -0,0 +1,63 @@
+import os
+
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from posts import placeholders
+from posts.models import ArchivedPost, Post
+from posts.utils import keyset_batches, parallel_map
+
+IMAGE_FIELD = Post._meta.get_field('image')
+
+
+def placeholder_batch(rows):
+    """Выполняется в дочернем процессе: только чтение файлов, без базы."""
+    return [
+        (pk, *placeholders.read(
+            IMAGE_FIELD.attr_class(None, IMAGE_FIELD, name)
+        ))
+        for pk, name in rows
+    ]
+
+
+class Command(BaseCommand):
+    help = ('Заполняет заглушки картинок (цвет и превью) у постов, '
+            'сохранённых до их появления, в нескольких процессах.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--processes', type=int, default=os.cpu_count() or 1
+        )
+        parser.add_argument('--batch-size', type=int, default=50)
+        parser.add_argument(
+            '--all', action='store_true',
+            help='Пересчитать все картинки, а не только без заглушки'
+        )
+
+    def handle(self, *args, **options):
+        for model in (Post, ArchivedPost):
+            updated = self.backfill(model, options)
+            self.stdout.write(
+                f'{model._meta.object_name}: обновлено {updated}'
+            )
+
+    def backfill(self, model, options):
+        # Файлы, которые не открылись как картинка, остаются без
+        # заглушки и проверяются при следующем запуске снова.
+        queryset = model.objects.exclude(Q(image='') | Q(image=None))
+        if not options['all']:
+            queryset = queryset.filter(image_color='')
+        source = keyset_batches(queryset, ['image'], options['batch_size'])
+        updated = 0
+        for batch in parallel_map(
+            placeholder_batch, source, options['processes']
+        ):
+            objs = [
+                model(pk=pk, image_color=color, image_preview=preview)
+                for pk, color, preview in batch if color
+            ]
+            model.objects.bulk_update(
+                objs, ['image_color', 'image_preview']
+            )
+            updated += len(objs)
+        return updated
@@ -0,0 +1,49 @@
+import timeit
+import tracemalloc
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from posts.models import Post
+from posts.readmodels import feed_queryset, feed_rows
+
+
+def peak_memory(load):
+    tracemalloc.start()
+    try:
+        load()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+class Command(BaseCommand):
+    help = ('Сравнивает память и время загрузки страницы ленты: полные '
+            'модели, модели с only() и строки readmodels.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--size', type=int, default=settings.LIMIT,
+            help='Постов на странице'
+        )
+        parser.add_argument('--number', type=int, default=200)
+
+    def handle(self, *args, **options):
+        posts = Post.objects.visible()
+        size = options['size']
+        loaders = (
+            ('модели', lambda: list(
+                posts.select_related('group', 'author')[:size]
+            )),
+            ('only()', lambda: list(feed_queryset(posts)[:size])),
+            ('строки', lambda: feed_rows(posts[:size])),
+        )
+        for name, load in loaders:
+            load()
+            per_page = timeit.timeit(
+                load, number=options['number']
+            ) / options['number']
+            self.stdout.write(
+                f'{name}: {per_page * 1000:.3f} мс, '
+                f'пик памяти {peak_memory(load) / 1024:.1f} КБ на страницу'
+            )
@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from posts.models import FollowSuggestion
+from posts.suggestions import FollowGraph
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает рекомендации "на кого подписаться".'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--top', type=int, default=10,
+            help='Сколько рекомендаций хранить на пользователя.'
+        )
+
+    def handle(self, *args, **options):
+        graph = FollowGraph()
+        total = 0
+        for batch in graph.batches():
+            suggestions = [
+                FollowSuggestion(user_id=user, suggested_id=suggested,
+                                 score=score)
+                for user, suggested, score in graph.top(batch, options['top'])
+            ]
+            with transaction.atomic():
+                FollowSuggestion.objects.filter(
+                    user_id__in=graph.user_ids[batch].tolist()
+                ).delete()
+                FollowSuggestion.objects.bulk_create(suggestions)
+            total += len(suggestions)
+        self.stdout.write(
+            f'Пользователей: {len(graph)}, рекомендаций: {total}'
+        )
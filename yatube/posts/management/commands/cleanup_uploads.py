@@ -0,0 +1,18 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from posts import uploads
+
+
+class Command(BaseCommand):
+    help = 'Удаляет незавершённые и неприкреплённые загрузки картинок.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--older-than', type=int, default=settings.UPLOAD_EXPIRE,
+            help='Возраст загрузки в секундах'
+        )
+
+    def handle(self, *args, **options):
+        count = uploads.cleanup(options['older_than'])
+        self.stdout.write(f'Удалено загрузок: {count}')
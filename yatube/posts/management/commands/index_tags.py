@@ -0,0 +1,37 @@
+import os
+
+from django.core.management.base import BaseCommand
+
+from posts import tags
+from posts.models import Post
+from posts.utils import keyset_batches, parallel_map
+
+
+def extract_batch(rows):
+    """Выполняется в дочернем процессе: только разбор текста."""
+    return [
+        (pk, pub_date, *tags.extract(text)) for pk, pub_date, text in rows
+    ]
+
+
+class Command(BaseCommand):
+    help = ('Строит индекс хэштегов и упоминаний для существующих постов, '
+            'разбирая тексты параллельно в нескольких процессах.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--processes', type=int, default=os.cpu_count() or 1
+        )
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        source = keyset_batches(
+            Post.objects.all(), ['pub_date', 'text'], options['batch_size']
+        )
+        indexed = 0
+        for posts in parallel_map(
+            extract_batch, source, options['processes']
+        ):
+            tags.index_posts(posts)
+            indexed += len(posts)
+        self.stdout.write(f'Проиндексировано постов: {indexed}')
@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from posts.models import Post
+from posts.utils import refresh_comment_stats
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает счётчики комментариев у постов.'
+
+    def handle(self, *args, **options):
+        updated = refresh_comment_stats(Post.objects.all())
+        self.stdout.write(f'Обновлено постов: {updated}')
@@ -0,0 +1,28 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from posts import trending
+
+
+class Command(BaseCommand):
+    help = 'Обслуживает рейтинг популярных постов.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rebuild', action='store_true',
+            help='Пересчитать рейтинг по комментариям с нуля.'
+        )
+
+    def handle(self, *args, **options):
+        if options['rebuild']:
+            # Старше десяти периодов полураспада вклад меньше 0.1%.
+            since = timezone.now() - timedelta(
+                seconds=settings.TRENDING_HALF_LIFE * 10
+            )
+            count = trending.rebuild(since)
+            self.stdout.write(f'Пересчитано постов: {count}')
+        removed = trending.prune()
+        self.stdout.write(f'Удалено остывших постов: {removed}')
@@ -0,0 +1,65 @@
+import os
+
+from django.core.management.base import BaseCommand
+
+from posts import markup
+from posts.models import ArchivedComment, ArchivedPost, Comment, Post
+from posts.utils import keyset_batches, parallel_map
+
+
+def render_batch(rows):
+    """Выполняется в дочернем процессе: только рендер, без базы.
+    В строках постов за текстом идёт его начало (excerpt)."""
+    return [
+        (pk, *(markup.render(text) for text in texts))
+        for pk, *texts in rows
+    ]
+
+
+class Command(BaseCommand):
+    help = ('Пересчитывает HTML постов и комментариев, отрисованный '
+            'старой версией разметки, параллельно в нескольких процессах.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--processes', type=int, default=os.cpu_count() or 1
+        )
+        parser.add_argument('--batch-size', type=int, default=200)
+        parser.add_argument(
+            '--all', action='store_true',
+            help='Пересчитать всё, а не только устаревшие версии'
+        )
+
+    def handle(self, *args, **options):
+        for model in (Post, Comment, ArchivedPost, ArchivedComment):
+            updated = self.rerender(model, options)
+            self.stdout.write(
+                f'{model._meta.object_name}: обновлено {updated}'
+            )
+
+    def rerender(self, model, options):
+        queryset = model.objects.all()
+        if not options['all']:
+            queryset = queryset.exclude(
+                text_html_version=markup.RENDERER_VERSION
+            )
+        fields, rendered_fields = ['text'], ['text_html']
+        if 'excerpt_html' in model.rendered_fields:
+            fields.append('excerpt')
+            rendered_fields.append('excerpt_html')
+        source = keyset_batches(queryset, fields, options['batch_size'])
+        updated = 0
+        for rendered in parallel_map(
+            render_batch, source, options['processes']
+        ):
+            model.objects.bulk_update(
+                [
+                    model(pk=pk,
+                          text_html_version=markup.RENDERER_VERSION,
+                          **dict(zip(rendered_fields, html)))
+                    for pk, *html in rendered
+                ],
+                [*rendered_fields, 'text_html_version']
+            )
+            updated += len(rendered)
+        return updated
@@ -0,0 +1,81 @@
+"""Разметка постов и комментариев.
+
+Небольшое подмножество Markdown: абзацы, **жирный**, *курсив*,
+`код`, [ссылки](https://...), голые ссылки, @упоминания и #теги.
+Текст сперва целиком экранируется, и только потом в него вставляются
+наши теги, поэтому HTML из текста пользователя в страницу не попадает.
+
+HTML считается один раз при сохранении текста (RenderedText.save) и
+хранится в text_html вместе с RENDERER_VERSION; у постов так же
+хранится excerpt_html для карточек лент. После изменения правил версию
+нужно увеличить и запустить manage.py rerender_text.
+"""
+import re
+
+from django.urls import reverse
+from django.utils.html import escape
+
+RENDERER_VERSION = 3
+
+PARAGRAPH = re.compile(r'\n\s*\n')
+CODE = re.compile(r'`([^`\n]+)`')
+BOLD = re.compile(r'\*\*(?=\S)(.+?)(?<=\S)\*\*')
+ITALIC = re.compile(r'(?<![*\w])\*(?=[^\s*])(.+?)(?<=[^\s*])\*(?![*\w])')
+# Общие с tags.py: что подсвечено ссылкой, то и попадает в индекс.
+# & в просмотре назад - чтобы не принять за тег сущность вида &#39;.
+MENTION_PATTERN = r'(?<![\w@/])@(?P<username>\w+)'
+TAG_PATTERN = r'(?<![\w&#/])#(?P<tag>\w{1,100})'
+INLINE = re.compile(
+    r'\[(?P<label>[^\]\n]+)\]\((?P<href>https?://[^\s)<]+)\)'
+    r'|(?P<url>\bhttps?://[^\s<]*[^\s<.,;:!?)\]])'
+    f'|{MENTION_PATTERN}|{TAG_PATTERN}'
+)
+
+
+def link(href, label):
+    return f'<a href="{href}" rel="nofollow noopener">{label}</a>'
+
+
+def inline(match):
+    if match.group('href'):
+        return link(match.group('href'), match.group('label'))
+    if match.group('url'):
+        return link(match.group('url'), match.group('url'))
+    tag = match.group('tag')
+    if tag:
+        url = reverse('posts:tag', kwargs={'tag': tag.lower()})
+        return f'<a href="{url}">#{tag}</a>'
+    username = match.group('username')
+    url = reverse('posts:profile', kwargs={'username': username})
+    return f'<a href="{url}">@{username}</a>'
+
+
+def render_inline(text):
+    """Уже экранированный текст без кода -> HTML."""
+    text = BOLD.sub(r'<strong>\1</strong>', text)
+    text = ITALIC.sub(r'<em>\1</em>', text)
+    return INLINE.sub(inline, text)
+
+
+def render_paragraph(text):
+    parts = CODE.split(escape(text.strip()))
+    # Нечётные части - содержимое `кода`, его не размечаем.
+    html = ''.join(
+        f'<code>{part}</code>' if index % 2 else render_inline(part)
+        for index, part in enumerate(parts)
+    )
+    return '<p>{}</p>'.format(html.replace('\n', '<br>'))
+
+
+def render(text):
+    return '\n'.join(
+        render_paragraph(paragraph)
+        for paragraph in PARAGRAPH.split(text.replace('\r\n', '\n'))
+        if paragraph.strip()
+    )
+
+
+def render_instance(instance):
+    """Заполняет text_html поста или комментария."""
+    instance.text_html = render(instance.text)
+    instance.text_html_version = RENDERER_VERSION
@@ -0,0 +1,66 @@
+# Generated by Django 2.2.16 on 2026-10-19 09:01
+
+from django.db import migrations, models
+
+BATCH_SIZE = 500
+# Длина на момент миграции; менять EXCERPT_LENGTH потом —
+# manage.py backfill_excerpts --all.
+EXCERPT_LENGTH = 300
+
+
+def make_excerpt(text):
+    """Копия posts.models.make_excerpt на момент миграции: историческая
+    миграция не должна зависеть от текущего кода."""
+    if len(text) <= EXCERPT_LENGTH:
+        return text, False
+    excerpt = text[:EXCERPT_LENGTH]
+    at_boundary = text[EXCERPT_LENGTH].isspace() or excerpt[-1].isspace()
+    if not at_boundary and len(excerpt.split(None, 1)) > 1:
+        excerpt = excerpt.rsplit(None, 1)[0]
+    return excerpt.rstrip() + '…', True
+
+
+def fill_excerpts(apps, schema_editor):
+    for name in ('Post', 'ArchivedPost'):
+        model = apps.get_model('posts', name)
+        posts = model.objects.exclude(text='').order_by('pk').only('text')
+        last_pk = 0
+        while True:
+            batch = list(posts.filter(pk__gt=last_pk)[:BATCH_SIZE])
+            if not batch:
+                break
+            for post in batch:
+                post.excerpt, post.has_more = make_excerpt(post.text)
+            model.objects.bulk_update(batch, ['excerpt', 'has_more'])
+            last_pk = batch[-1].pk
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0007_archive'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='archivedpost',
+            name='excerpt',
+            field=models.TextField(blank=True, verbose_name='Начало текста'),
+        ),
+        migrations.AddField(
+            model_name='archivedpost',
+            name='has_more',
+            field=models.BooleanField(default=False, verbose_name='Текст длиннее начала'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='excerpt',
+            field=models.TextField(blank=True, editable=False, verbose_name='Начало текста'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='has_more',
+            field=models.BooleanField(default=False, editable=False, verbose_name='Текст длиннее начала'),
+        ),
+        migrations.RunPython(fill_excerpts, migrations.RunPython.noop),
+    ]
@@ -1,19 +1,85 @@
+import uuid
+
+from django.conf import settings
 from django.db import models
 from django.contrib.auth import get_user_model
 
+from . import markup, placeholders
+
 User = get_user_model()
 
 
+def make_excerpt(text):
+    """Начало текста для карточки в ленте, обрезанное по слову, и
+    признак, что текст длиннее."""
+    limit = settings.EXCERPT_LENGTH
+    if len(text) <= limit:
+        return text, False
+    excerpt = text[:limit]
+    # Слово на границе обрезки не показываем наполовину.
+    at_boundary = text[limit].isspace() or excerpt[-1].isspace()
+    if not at_boundary and len(excerpt.split(None, 1)) > 1:
+        excerpt = excerpt.rsplit(None, 1)[0]
+    return excerpt.rstrip() + '…', True
+
+
+class PostQuerySet(models.QuerySet):
+    def visible(self):
+        """Посты без удалённых: помеченных постов и постов
+        удаляемых (неактивных) авторов."""
+        return self.filter(is_deleted=False, author__is_active=True)
+
+
+class RenderedText(models.Model):
+    """HTML текста, посчитанный при сохранении (см. markup.py)."""
+    text_html = models.TextField(
+        verbose_name='Текст в HTML',
+        blank=True,
+        editable=False
+    )
+    text_html_version = models.PositiveSmallIntegerField(
+        verbose_name='Версия разметки',
+        default=0,
+        editable=False
+    )
+    # Поля, которые заполняет render(): их добавляем в update_fields.
+    rendered_fields = ('text_html', 'text_html_version')
+
+    class Meta:
+        abstract = True
+
+    def render(self):
+        markup.render_instance(self)
+
+    def save(self, *args, **kwargs):
+        """HTML пересчитывается при любом сохранении текста - из формы,
+        админки или кода."""
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or 'text' in update_fields:
+            self.render()
+            if update_fields is not None:
+                kwargs['update_fields'] = {
+                    *update_fields, *self.rendered_fields
+                }
+        super().save(*args, **kwargs)
+
+
 class Group(models.Model):
     title = models.CharField(max_length=200)
     slug = models.SlugField(max_length=200, unique=True)
     description = models.TextField()
+    # Группа помечается сразу, а посты отвязываются в фоне (deletion.py).
+    is_deleted = models.BooleanField(
+        verbose_name='Удалена',
+        default=False,
+        editable=False
+    )
 
     def __str__(self):
         return self.title
 
 
-class Post(models.Model):
+class Post(RenderedText):
     text = models.TextField(
         verbose_name='Текст поста',
         help_text='Введите текст поста'
@@ -44,6 +110,69 @@ class Post(models.Model):
         blank=True,
         help_text='Загрузите картинку'
     )
+    # Заглушка на время загрузки картинки, её пересчитывает save()
+    # при смене картинки (см. placeholders.py).
+    image_color = models.CharField(
+        verbose_name='Основной цвет картинки',
+        max_length=7,
+        blank=True,
+        editable=False
+    )
+    image_preview = models.TextField(
+        verbose_name='Превью картинки',
+        blank=True,
+        editable=False
+    )
+    # Денормализованные счётчики для карточек в лентах, их ведут
+    # сигналы комментариев (см. signals.py).
+    comment_count = models.PositiveIntegerField(
+        verbose_name='Комментариев',
+        default=0,
+        editable=False
+    )
+    last_comment_at = models.DateTimeField(
+        verbose_name='Последний комментарий',
+        null=True,
+        blank=True,
+        editable=False
+    )
+    # Приблизительное число лайков: пересчитывается фоновой задачей не
+    # чаще раза в LIKES_FLUSH_DELAY секунд (см. likes.py).
+    like_count = models.PositiveIntegerField(
+        verbose_name='Лайков',
+        default=0,
+        editable=False
+    )
+    is_deleted = models.BooleanField(
+        verbose_name='Удалён',
+        default=False,
+        editable=False
+    )
+    # Ленты читают только начало текста (text откладывается через
+    # defer), полный текст нужен лишь странице поста.
+    excerpt = models.TextField(
+        verbose_name='Начало текста',
+        blank=True,
+        editable=False
+    )
+    has_more = models.BooleanField(
+        verbose_name='Текст длиннее начала',
+        default=False,
+        editable=False
+    )
+    # Начало текста в HTML - карточки лент показывают разметку, не
+    # отрисовывая её на каждый просмотр.
+    excerpt_html = models.TextField(
+        verbose_name='Начало текста в HTML',
+        blank=True,
+        editable=False
+    )
+
+    objects = PostQuerySet.as_manager()
+    is_archived = False
+    rendered_fields = RenderedText.rendered_fields + ('excerpt_html',)
+    # Имя картинки, прочитанное из базы.
+    _loaded_image = ''
 
     class Meta:
         ordering = ['-pub_date']
@@ -51,8 +180,45 @@ class Post(models.Model):
     def __str__(self):
         return self.text[:15]
 
+    def render(self):
+        super().render()
+        self.excerpt_html = markup.render(self.excerpt)
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if 'image' in field_names:
+            instance._loaded_image = values[field_names.index('image')]
+        return instance
+
+    def image_changed(self):
+        if 'image' in self.get_deferred_fields():
+            return False
+        return (self.image.name or '') != self._loaded_image
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or 'text' in update_fields:
+            self.excerpt, self.has_more = make_excerpt(self.text)
+            if update_fields is not None:
+                update_fields = kwargs['update_fields'] = {
+                    *update_fields, 'excerpt', 'has_more'
+                }
+        if ((update_fields is None or 'image' in update_fields)
+                and self.image_changed()):
+            self.image_color, self.image_preview = (
+                placeholders.read(self.image) if self.image else ('', '')
+            )
+            if update_fields is not None:
+                kwargs['update_fields'] = {
+                    *update_fields, 'image_color', 'image_preview'
+                }
+        super().save(*args, **kwargs)
+        if 'image' not in self.get_deferred_fields():
+            self._loaded_image = self.image.name or ''
+
 
-class Comment(models.Model):
+class Comment(RenderedText):
     post = models.ForeignKey(
         Post,
         on_delete=models.CASCADE,
@@ -72,7 +238,8 @@ class Comment(models.Model):
     )
     created = models.DateTimeField(
         verbose_name='Дата комментария',
-        auto_now_add=True
+        auto_now_add=True,
+        db_index=True
     )
 
     class Meta:
@@ -106,3 +273,470 @@ class Follow(models.Model):
                 name='non_self_follow'
             )
         ]
+
+
+class FollowSuggestion(models.Model):
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='follow_suggestions',
+        verbose_name='Пользователь'
+    )
+    suggested = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name='Рекомендуемый автор'
+    )
+    score = models.FloatField(verbose_name='Оценка')
+
+    class Meta:
+        ordering = ['-score']
+        constraints = [
+            models.UniqueConstraint(
+                name='unique_follow_suggestions',
+                fields=['user', 'suggested'],
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.user} -> {self.suggested}'
+
+
+class TrendingScore(models.Model):
+    """Рейтинг поста в "популярном" с экспоненциальным затуханием.
+
+    Хранится логарифм суммы весов событий, умноженных на exp(λ·t):
+    порядок таких значений не меняется со временем, поэтому
+    пересчитывать старые строки при новом событии не нужно."""
+    post = models.OneToOneField(
+        Post,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='trending',
+        verbose_name='Пост'
+    )
+    score = models.FloatField(verbose_name='Рейтинг', db_index=True)
+
+    class Meta:
+        ordering = ['-score']
+
+    def __str__(self):
+        return f'{self.post}: {self.score:.2f}'
+
+
+class Deletion(models.Model):
+    """Фоновое удаление пользователя, группы или поста.
+
+    Объект сразу скрывается, а зависимые строки удаляются небольшими
+    пачками, чтобы не держать блокировку базы одной большой
+    транзакцией."""
+    POST = 'post'
+    GROUP = 'group'
+    USER = 'user'
+    KIND_CHOICES = (
+        (POST, 'Пост'),
+        (GROUP, 'Группа'),
+        (USER, 'Пользователь'),
+    )
+    PENDING = 'pending'
+    DONE = 'done'
+    STATUS_CHOICES = (
+        (PENDING, 'Выполняется'),
+        (DONE, 'Завершено'),
+    )
+
+    kind = models.CharField(
+        verbose_name='Что удаляем',
+        max_length=10,
+        choices=KIND_CHOICES
+    )
+    object_id = models.PositiveIntegerField(verbose_name='id объекта')
+    name = models.CharField(verbose_name='Объект', max_length=200)
+    status = models.CharField(
+        verbose_name='Статус',
+        max_length=10,
+        choices=STATUS_CHOICES,
+        default=PENDING
+    )
+    total = models.PositiveIntegerField(
+        verbose_name='Всего строк',
+        default=0
+    )
+    processed = models.PositiveIntegerField(
+        verbose_name='Обработано строк',
+        default=0
+    )
+    created = models.DateTimeField(
+        verbose_name='Начато',
+        auto_now_add=True
+    )
+    finished = models.DateTimeField(
+        verbose_name='Завершено',
+        null=True,
+        blank=True
+    )
+
+    class Meta:
+        ordering = ['-created']
+
+    def __str__(self):
+        return f'{self.get_kind_display()} {self.name}'
+
+    @property
+    def progress(self):
+        """Процент выполнения; строки, появившиеся после начала
+        удаления, за 100% не выводят."""
+        if self.status == self.DONE or not self.total:
+            return 100 if self.status == self.DONE else 0
+        return min(99, self.processed * 100 // self.total)
+
+
+class ArchivedPost(RenderedText):
+    """Старый пост, перенесённый из Post командой archive_posts.
+
+    id совпадает с id исходного поста, поля называются так же, поэтому
+    шаблоны и ссылки на пост работают без изменений. Архив только для
+    чтения."""
+    id = models.IntegerField(primary_key=True)
+    text = models.TextField(verbose_name='Текст поста')
+    excerpt = models.TextField(verbose_name='Начало текста', blank=True)
+    has_more = models.BooleanField(
+        verbose_name='Текст длиннее начала',
+        default=False
+    )
+    excerpt_html = models.TextField(
+        verbose_name='Начало текста в HTML',
+        blank=True
+    )
+    pub_date = models.DateTimeField(
+        verbose_name='Дата публикации',
+        db_index=True
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='archived_posts',
+        verbose_name='Автор'
+    )
+    group = models.ForeignKey(
+        Group,
+        blank=True,
+        null=True,
+        on_delete=models.SET_NULL,
+        related_name='archived_posts',
+        verbose_name='Группа'
+    )
+    image = models.ImageField(
+        verbose_name='Картинка',
+        upload_to='posts/',
+        blank=True
+    )
+    image_color = models.CharField(
+        verbose_name='Основной цвет картинки',
+        max_length=7,
+        blank=True
+    )
+    image_preview = models.TextField(
+        verbose_name='Превью картинки',
+        blank=True
+    )
+    comment_count = models.PositiveIntegerField(
+        verbose_name='Комментариев',
+        default=0
+    )
+    last_comment_at = models.DateTimeField(
+        verbose_name='Последний комментарий',
+        null=True,
+        blank=True
+    )
+    like_count = models.PositiveIntegerField(
+        verbose_name='Лайков',
+        default=0
+    )
+    archived = models.DateTimeField(
+        verbose_name='Перенесён в архив',
+        auto_now_add=True
+    )
+    is_archived = True
+    rendered_fields = RenderedText.rendered_fields + ('excerpt_html',)
+
+    class Meta:
+        ordering = ['-pub_date']
+
+    def __str__(self):
+        return self.text[:15]
+
+    def render(self):
+        super().render()
+        self.excerpt_html = markup.render(self.excerpt)
+
+
+class ArchivedComment(RenderedText):
+    id = models.IntegerField(primary_key=True)
+    post = models.ForeignKey(
+        ArchivedPost,
+        on_delete=models.CASCADE,
+        related_name='comments',
+        verbose_name='Пост'
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='archived_comments',
+        verbose_name='Автор'
+    )
+    text = models.TextField(verbose_name='Текст комментария')
+    created = models.DateTimeField(verbose_name='Дата комментария')
+
+    class Meta:
+        ordering = ['-created']
+
+    def __str__(self):
+        return self.text[:15]
+
+
+class PostTag(models.Model):
+    """Обратный индекс хэштегов: страница тега читает его по индексу
+    (tag, pub_date), не просматривая тексты постов."""
+    tag = models.CharField(verbose_name='Тег', max_length=100)
+    pub_date = models.DateTimeField(verbose_name='Дата публикации')
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='tags',
+        verbose_name='Пост'
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                name='unique_post_tags',
+                fields=['tag', 'post'],
+            ),
+        ]
+        indexes = [
+            models.Index(
+                name='post_tag_feed_idx',
+                fields=['tag', '-pub_date', '-post'],
+            ),
+        ]
+
+    def __str__(self):
+        return f'#{self.tag}'
+
+
+class PostMention(models.Model):
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='mentions',
+        verbose_name='Упомянутый пользователь'
+    )
+    pub_date = models.DateTimeField(verbose_name='Дата публикации')
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='mentions',
+        verbose_name='Пост'
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                name='unique_post_mentions',
+                fields=['user', 'post'],
+            ),
+        ]
+        indexes = [
+            models.Index(
+                name='post_mention_feed_idx',
+                fields=['user', '-pub_date', '-post'],
+            ),
+        ]
+
+    def __str__(self):
+        return f'@{self.user}'
+
+
+class Like(models.Model):
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='likes',
+        verbose_name='Пользователь'
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='likes',
+        verbose_name='Пост'
+    )
+    created = models.DateTimeField(
+        verbose_name='Дата',
+        auto_now_add=True
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                name='unique_likes',
+                fields=['user', 'post'],
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.user} -> {self.post}'
+
+
+class PostViewDaily(models.Model):
+    """Просмотры поста за день. Пишутся пачками из буфера в памяти
+    процесса (pageviews.py), а не строкой на каждый просмотр."""
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='daily_views',
+        verbose_name='Пост'
+    )
+    day = models.DateField(verbose_name='День')
+    views = models.PositiveIntegerField(
+        verbose_name='Просмотров',
+        default=0
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                name='unique_post_view_days',
+                fields=['post', 'day'],
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.post}: {self.day} - {self.views}'
+
+
+class ArchivedPostTag(models.Model):
+    """Хэштеги архивного поста: archive_posts переносит их вместе с
+    постом, чтобы каскад от Post их не удалил."""
+    tag = models.CharField(verbose_name='Тег', max_length=100)
+    pub_date = models.DateTimeField(verbose_name='Дата публикации')
+    post = models.ForeignKey(
+        ArchivedPost,
+        on_delete=models.CASCADE,
+        related_name='tags',
+        verbose_name='Пост'
+    )
+
+    def __str__(self):
+        return f'#{self.tag}'
+
+
+class ArchivedPostMention(models.Model):
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='archived_mentions',
+        verbose_name='Упомянутый пользователь'
+    )
+    pub_date = models.DateTimeField(verbose_name='Дата публикации')
+    post = models.ForeignKey(
+        ArchivedPost,
+        on_delete=models.CASCADE,
+        related_name='mentions',
+        verbose_name='Пост'
+    )
+
+    def __str__(self):
+        return f'@{self.user}'
+
+
+class ArchivedLike(models.Model):
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='archived_likes',
+        verbose_name='Пользователь'
+    )
+    post = models.ForeignKey(
+        ArchivedPost,
+        on_delete=models.CASCADE,
+        related_name='likes',
+        verbose_name='Пост'
+    )
+    created = models.DateTimeField(verbose_name='Дата')
+
+    def __str__(self):
+        return f'{self.user} -> {self.post}'
+
+
+class ArchivedPostViewDaily(models.Model):
+    post = models.ForeignKey(
+        ArchivedPost,
+        on_delete=models.CASCADE,
+        related_name='daily_views',
+        verbose_name='Пост'
+    )
+    day = models.DateField(verbose_name='День')
+    views = models.PositiveIntegerField(verbose_name='Просмотров')
+
+    def __str__(self):
+        return f'{self.post}: {self.day} - {self.views}'
+
+
+class ImageUpload(models.Model):
+    """Картинка, загружаемая по частям через API (uploads.py).
+
+    Части пишутся прямо в файл UPLOAD_TEMP_DIR/<id>.part, received -
+    сколько байт уже принято: с этого смещения клиент продолжает после
+    обрыва связи."""
+    PENDING = 'pending'
+    COMPLETE = 'complete'
+    ATTACHED = 'attached'
+    FAILED = 'failed'
+    STATUS_CHOICES = (
+        (PENDING, 'Загружается'),
+        (COMPLETE, 'Загружена'),
+        (ATTACHED, 'Прикреплена к посту'),
+        (FAILED, 'Ошибка'),
+    )
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4,
+                          editable=False)
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='image_uploads',
+        verbose_name='Пользователь'
+    )
+    filename = models.CharField(verbose_name='Имя файла', max_length=100)
+    size = models.PositiveIntegerField(verbose_name='Размер, байт')
+    sha256 = models.CharField(verbose_name='SHA-256', max_length=64)
+    received = models.PositiveIntegerField(
+        verbose_name='Принято байт',
+        default=0
+    )
+    status = models.CharField(
+        verbose_name='Статус',
+        max_length=10,
+        choices=STATUS_CHOICES,
+        default=PENDING
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+',
+        verbose_name='Пост'
+    )
+    created = models.DateTimeField(
+        verbose_name='Начата',
+        auto_now_add=True
+    )
+
+    class Meta:
+        ordering = ['-created']
+
+    def __str__(self):
+        return f'{self.filename} ({self.get_status_display()})'
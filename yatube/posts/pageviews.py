@@ -0,0 +1,111 @@
+"""Счётчик просмотров постов.
+
+Просмотр страницы не пишет в базу: повторные просмотры той же сессией
+за VIEWS_DEDUP_WINDOW отсекаются через cache.add, остальные копятся в
+памяти процесса и раз в VIEWS_FLUSH_INTERVAL секунд одной транзакцией
+переносятся в PostViewDaily фоновым потоком. Поток запускает wsgi.py;
+при остановке процесса буфер сбрасывается через atexit.
+"""
+import atexit
+import logging
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections, transaction
+from django.db.models import F, Sum
+from django.utils import timezone
+
+from core.ratelimit import client_ip
+from .models import Post, PostViewDaily
+
+logger = logging.getLogger(__name__)
+
+SEEN_KEY = 'views:seen:{}:{}'
+
+
+class ViewBuffer:
+    def __init__(self):
+        self.counts = Counter()
+        self.lock = threading.Lock()
+
+    def add(self, post_id):
+        with self.lock:
+            self.counts[post_id] += 1
+
+    def drain(self):
+        with self.lock:
+            counts, self.counts = self.counts, Counter()
+        return counts
+
+    def flush(self):
+        """Переносим накопленное в базу. Возвращает число просмотров."""
+        counts = self.drain()
+        if not counts:
+            return 0
+        try:
+            write_counts(counts)
+        except Exception:
+            with self.lock:
+                self.counts.update(counts)
+            raise
+        return sum(counts.values())
+
+
+def write_counts(counts):
+    day = timezone.localdate()
+    post_ids = set(
+        Post.objects.filter(pk__in=counts).values_list('pk', flat=True)
+    )
+    with transaction.atomic():
+        # Сначала строки дня с нулём: так два процесса не теряют
+        # просмотры, создавая одну и ту же строку.
+        PostViewDaily.objects.bulk_create(
+            [PostViewDaily(post_id=post_id, day=day) for post_id in post_ids],
+            ignore_conflicts=True
+        )
+        for post_id in post_ids:
+            PostViewDaily.objects.filter(post_id=post_id, day=day).update(
+                views=F('views') + counts[post_id]
+            )
+
+
+buffer = ViewBuffer()
+
+
+def register_view(request, post_id):
+    """Учитываем просмотр, если эта сессия недавно пост не видела."""
+    identity = request.COOKIES.get(settings.SESSION_COOKIE_NAME) or (
+        'ip:' + client_ip(request)
+    )
+    if cache.add(SEEN_KEY.format(post_id, identity), True,
+                 settings.VIEWS_DEDUP_WINDOW):
+        buffer.add(post_id)
+
+
+def view_count(post_id):
+    return PostViewDaily.objects.filter(post_id=post_id).aggregate(
+        views=Sum('views')
+    )['views'] or 0
+
+
+def flush_loop():
+    while True:
+        time.sleep(settings.VIEWS_FLUSH_INTERVAL)
+        try:
+            buffer.flush()
+        except Exception:
+            logger.exception('Не удалось сохранить просмотры постов')
+        finally:
+            close_old_connections()
+
+
+def start_flusher():
+    thread = threading.Thread(
+        target=flush_loop, name='post-views-flusher', daemon=True
+    )
+    thread.start()
+    atexit.register(buffer.flush)
+    return thread
@@ -0,0 +1,51 @@
+"""Заглушки картинок постов.
+
+Пока браузер качает миниатюру 960x339, на её месте показывается
+основной цвет картинки и размытое превью 16x6 - PNG в data URI на пару
+сотен байт. Оба значения считаются один раз, когда у поста меняется
+картинка (Post.save), и хранятся в колонках поста, так что лентам не
+нужно ничего открывать. Старые посты заполняет manage.py
+backfill_placeholders.
+"""
+import base64
+import io
+
+from PIL import Image, ImageOps
+
+# Пропорции те же, что у миниатюры в ленте, с тем же кадрированием.
+PREVIEW_SIZE = (16, 6)
+
+
+def make(image):
+    """Картинка PIL -> (цвет '#rrggbb', превью data URI)."""
+    # Для JPEG сразу декодируем в уменьшенном масштабе.
+    image.draft('RGB', (PREVIEW_SIZE[0] * 8, PREVIEW_SIZE[1] * 8))
+    preview = ImageOps.fit(image.convert('RGB'), PREVIEW_SIZE)
+    # Основной цвет - самый частый из четырёх цветов палитры превью.
+    paletted = preview.quantize(4)
+    _, index = max(paletted.getcolors())
+    color = '#{:02x}{:02x}{:02x}'.format(
+        *paletted.getpalette()[index * 3:index * 3 + 3]
+    )
+    buffer = io.BytesIO()
+    preview.save(buffer, 'PNG', optimize=True)
+    data = base64.b64encode(buffer.getvalue()).decode()
+    return color, f'data:image/png;base64,{data}'
+
+
+def read(file):
+    """Заглушка для файла (File, FieldFile); ('', ''), если файл не
+    открывается как картинка. Файл после чтения возвращается в начало,
+    а открытый здесь - закрывается, как в ImageFieldFile.width."""
+    close = file.closed
+    try:
+        file.open('rb')
+        with Image.open(file) as image:
+            return make(image)
+    except Exception:
+        return '', ''
+    finally:
+        if close:
+            file.close()
+        else:
+            file.seek(0)
@@ -0,0 +1,120 @@
+"""Лёгкие объекты для отрисовки лент.
+
+Карточке поста (includes/article.html) нужны десяток колонок, а модель
+тянет все: хэш пароля автора, описание группы и т. д. Здесь строки
+читаются через values_list ровно с нужными колонками в объекты со
+__slots__ и теми же атрибутами, что читают шаблоны.
+
+Там, где страница обязана отдавать экземпляры Post (page_obj лент),
+используется feed_queryset: те же колонки через only().
+"""
+from .models import Post
+
+IMAGE_FIELD = Post._meta.get_field('image')
+
+FEED_FIELDS = (
+    'excerpt', 'excerpt_html', 'has_more', 'pub_date', 'image',
+    'image_color', 'image_preview', 'comment_count', 'last_comment_at',
+    'like_count', 'author', 'author__username', 'author__first_name',
+    'author__last_name', 'group', 'group__title', 'group__slug',
+)
+FEED_COLUMNS = (
+    'pk', 'excerpt', 'excerpt_html', 'has_more', 'pub_date', 'image',
+    'image_color', 'image_preview', 'comment_count', 'last_comment_at',
+    'like_count', 'author_id', 'author__username', 'author__first_name',
+    'author__last_name', 'group_id', 'group__title', 'group__slug',
+)
+
+
+class AuthorRow:
+    __slots__ = ('pk', 'username', 'first_name', 'last_name')
+
+    def __init__(self, pk, username, first_name, last_name):
+        self.pk = pk
+        self.username = username
+        self.first_name = first_name
+        self.last_name = last_name
+
+    def __str__(self):
+        return self.username
+
+    def get_full_name(self):
+        return f'{self.first_name} {self.last_name}'.strip()
+
+
+class GroupRow:
+    __slots__ = ('pk', 'title', 'slug')
+
+    def __init__(self, pk, title, slug):
+        self.pk = pk
+        self.title = title
+        self.slug = slug
+
+    def __str__(self):
+        return self.title
+
+
+class PostRow:
+    __slots__ = ('pk', 'excerpt', 'excerpt_html', 'has_more', 'pub_date',
+                 'image', 'image_color', 'image_preview', 'comment_count',
+                 'last_comment_at', 'like_count', 'author', 'group',
+                 'thumbnail')
+    is_archived = False
+
+    def __init__(self, pk, excerpt, excerpt_html, has_more, pub_date, image,
+                 image_color, image_preview, comment_count, last_comment_at,
+                 like_count, author, group):
+        self.pk = pk
+        self.excerpt = excerpt
+        self.excerpt_html = excerpt_html
+        self.has_more = has_more
+        self.pub_date = pub_date
+        self.image = image
+        self.image_color = image_color
+        self.image_preview = image_preview
+        self.comment_count = comment_count
+        self.last_comment_at = last_comment_at
+        self.like_count = like_count
+        self.author = author
+        self.group = group
+        # Заполняет thumbnails.resolve.
+        self.thumbnail = None
+
+    @property
+    def id(self):
+        return self.pk
+
+    def __str__(self):
+        return self.excerpt[:15]
+
+
+def feed_queryset(queryset):
+    """Экземпляры модели, но только с колонками карточки поста."""
+    return queryset.select_related('group', 'author').only(*FEED_FIELDS)
+
+
+def feed_rows(queryset):
+    """Список PostRow; авторы и группы одной выборки не дублируются."""
+    authors = {}
+    groups = {}
+    rows = []
+    values = queryset.values_list(*FEED_COLUMNS)
+    for (pk, excerpt, excerpt_html, has_more, pub_date, image, image_color,
+         image_preview, comment_count, last_comment_at, like_count,
+         author_id, username, first_name, last_name, group_id, title,
+         slug) in values:
+        author = authors.get(author_id)
+        if author is None:
+            author = authors[author_id] = AuthorRow(
+                author_id, username, first_name, last_name
+            )
+        group = groups.get(group_id)
+        if group is None and group_id is not None:
+            group = groups[group_id] = GroupRow(group_id, title, slug)
+        rows.append(PostRow(
+            pk, excerpt, excerpt_html, has_more, pub_date,
+            IMAGE_FIELD.attr_class(None, IMAGE_FIELD, image),
+            image_color, image_preview, comment_count, last_comment_at,
+            like_count, author, group
+        ))
+    return rows
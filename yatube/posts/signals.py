@@ -0,0 +1,93 @@
+from django.db import transaction
+from django.db.models import F, Max
+from django.db.models.functions import Greatest
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from . import autocomplete, lookups, tags, trending
+from .models import Comment, Group, Post, User
+from .utils import bump_latest_post_version
+
+
+@receiver(post_save, sender=Post)
+def update_latest_post_id(sender, instance, created, **kwargs):
+    """Сбрасываем отметку самого нового поста для проверки обновлений."""
+    if created:
+        # После коммита: до него читатели ещё не видят пост в базе.
+        transaction.on_commit(bump_latest_post_version)
+
+
+@receiver(post_save, sender=Post)
+def index_tags(sender, instance, update_fields=None, **kwargs):
+    """Индекс тегов и упоминаний - при любом сохранении текста поста,
+    в том числе из админки."""
+    if update_fields is None or {'text', 'pub_date'} & update_fields:
+        tags.index_post(instance)
+
+
+@receiver(post_save, sender=Comment)
+def update_trending_score(sender, instance, created, **kwargs):
+    if created:
+        trending.register_engagement(instance.post_id, when=instance.created)
+
+
+@receiver(post_save, sender=Comment)
+def increment_comment_count(sender, instance, created, **kwargs):
+    if created:
+        Post.objects.filter(pk=instance.post_id).update(
+            comment_count=F('comment_count') + 1,
+            last_comment_at=instance.created
+        )
+
+
+@receiver(post_delete, sender=Comment)
+def decrement_comment_count(sender, instance, **kwargs):
+    last_comment_at = Comment.objects.filter(
+        post_id=instance.post_id
+    ).aggregate(last=Max('created'))['last']
+    # Счётчик мог разойтись с таблицей - ниже нуля не уходим.
+    Post.objects.filter(pk=instance.post_id).update(
+        comment_count=Greatest(F('comment_count') - 1, 0),
+        last_comment_at=last_comment_at
+    )
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def refresh_group_autocomplete(sender, **kwargs):
+    autocomplete.groups.invalidate()
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def refresh_user_autocomplete(sender, update_fields=None, **kwargs):
+    # Вход пользователя сохраняет только last_login - индекс не меняется.
+    if update_fields is None or {'username', 'is_active'} & update_fields:
+        autocomplete.users.invalidate()
+
+
+@receiver(pre_save, sender=Group)
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def forget_group_lookup(sender, instance, **kwargs):
+    """Сбрасываем и новый, и прежний slug: переименованная группа не
+    должна открываться по старому адресу."""
+    lookups.groups.invalidate(instance.slug)
+    if kwargs.get('signal') is pre_save and instance.pk:
+        for slug in Group.objects.filter(pk=instance.pk).values_list(
+            'slug', flat=True
+        ):
+            lookups.groups.invalidate(slug)
+
+
+@receiver(pre_save, sender=User)
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def forget_user_lookup(sender, instance, update_fields=None, **kwargs):
+    lookups.users.invalidate(instance.username)
+    if (kwargs.get('signal') is pre_save and instance.pk
+            and (update_fields is None or 'username' in update_fields)):
+        for username in User.objects.filter(pk=instance.pk).values_list(
+            'username', flat=True
+        ):
+            lookups.users.invalidate(username)
@@ -0,0 +1,129 @@
+"""Рекомендации "на кого подписаться".
+
+Граф подписок и комментариев загружается в массивы NumPy в формате CSR
+(indptr/indices), а кандидаты считаются пачками пользователей сразу:
+друзья друзей плюс те, кто комментировал те же посты. Оценки тоже
+разреженные: считаются только встретившиеся пары (пользователь,
+кандидат), поэтому память пачки зависит от числа путей в графе, а не
+от числа пользователей.
+"""
+import numpy as np
+
+from .models import Comment, Follow, User
+
+FRIEND_OF_FRIEND_WEIGHT = 1.0
+CO_COMMENTER_WEIGHT = 0.5
+# Пользователей в одной пачке расчёта.
+BATCH_SIZE = 1000
+
+
+class CSR:
+    """Разреженная матрица смежности: соседи строки i -
+    indices[indptr[i]:indptr[i + 1]]."""
+
+    def __init__(self, rows, cols, n_rows):
+        order = np.argsort(rows, kind='stable')
+        self.indices = cols[order]
+        self.indptr = np.zeros(n_rows + 1, dtype=np.int64)
+        np.cumsum(
+            np.bincount(rows, minlength=n_rows), out=self.indptr[1:]
+        )
+
+    def expand(self, rows):
+        """Соседи сразу для набора строк.
+
+        Возвращает пары (позиция строки в rows, сосед)."""
+        starts = self.indptr[rows]
+        counts = self.indptr[rows + 1] - starts
+        owners = np.repeat(np.arange(len(rows)), counts)
+        offsets = np.arange(counts.sum()) - np.repeat(
+            np.cumsum(counts) - counts, counts
+        )
+        return owners, self.indices[np.repeat(starts, counts) + offsets]
+
+
+def _edges(queryset, ids):
+    """Пары id из базы -> пары номеров строк в матрице."""
+    pairs = np.array(list(queryset), dtype=np.int64).reshape(-1, 2)
+    return np.searchsorted(ids, pairs[:, 0]), pairs[:, 1]
+
+
+class FollowGraph:
+    def __init__(self):
+        self.user_ids = np.array(
+            User.objects.order_by('pk').values_list('pk', flat=True),
+            dtype=np.int64
+        )
+        n_users = len(self.user_ids)
+        rows, authors = _edges(
+            Follow.objects.values_list('user_id', 'author_id'),
+            self.user_ids
+        )
+        self.follows = CSR(
+            rows, np.searchsorted(self.user_ids, authors), n_users
+        )
+        rows, post_ids = _edges(
+            Comment.objects.values_list('author_id', 'post_id').distinct(),
+            self.user_ids
+        )
+        posts, post_rows = np.unique(post_ids, return_inverse=True)
+        self.commented = CSR(rows, post_rows, n_users)
+        self.commenters = CSR(post_rows, rows, len(posts))
+
+    def __len__(self):
+        return len(self.user_ids)
+
+    def batches(self):
+        for start in range(0, len(self), BATCH_SIZE):
+            yield np.arange(start, min(start + BATCH_SIZE, len(self)))
+
+    def scores(self, batch):
+        """Ненулевые оценки кандидатов: массивы (позиция пользователя
+        в batch, кандидат, оценка)."""
+        n_users = len(self)
+        owners, friends = self.follows.expand(batch)
+        fof_owners, candidates = self.follows.expand(friends)
+        owner_parts = [owners[fof_owners]]
+        candidate_parts = [candidates]
+        weight_parts = [np.full(len(candidates), FRIEND_OF_FRIEND_WEIGHT)]
+        post_owners, posts = self.commented.expand(batch)
+        co_owners, candidates = self.commenters.expand(posts)
+        owner_parts.append(post_owners[co_owners])
+        candidate_parts.append(candidates)
+        weight_parts.append(np.full(len(candidates), CO_COMMENTER_WEIGHT))
+        # Номер ячейки пары: позиция пользователя * n_users + кандидат.
+        cells = (
+            np.concatenate(owner_parts) * n_users
+            + np.concatenate(candidate_parts)
+        )
+        weights = np.concatenate(weight_parts)
+        # Себя и тех, на кого уже подписан, не предлагаем.
+        excluded = np.concatenate([
+            np.arange(len(batch)) * n_users + batch,
+            owners * n_users + friends,
+        ])
+        keep = ~np.isin(cells, excluded)
+        cells, inverse = np.unique(cells[keep], return_inverse=True)
+        scores = np.bincount(inverse, weights=weights[keep])
+        return cells // n_users, cells % n_users, scores
+
+    def top(self, batch, k):
+        """Лучшие k кандидатов для каждого пользователя пачки:
+        пары (id пользователя, id кандидата, оценка)."""
+        rows, candidates, scores = self.scores(batch)
+        # По пользователю, внутри - по убыванию оценки; место в группе
+        # - расстояние от её начала.
+        order = np.lexsort((-scores, rows))
+        rows, candidates, scores = (
+            rows[order], candidates[order], scores[order]
+        )
+        rank = np.arange(len(rows)) - np.searchsorted(rows, rows)
+        best = rank < k
+        for row, candidate, score in zip(
+            rows[best], candidates[best], scores[best]
+        ):
+            yield (
+                int(self.user_ids[batch[row]]),
+                int(self.user_ids[candidate]),
+                float(score),
+            )
@@ -0,0 +1,57 @@
+"""Хэштеги и упоминания в постах.
+
+Извлекаются при сохранении поста (сигнал post_save) в таблицы
+PostTag и PostMention, по которым страницы тега и упоминаний читают
+посты через индекс, а не поиском по тексту.
+"""
+import re
+
+from django.db import transaction
+
+from .markup import MENTION_PATTERN, TAG_PATTERN
+from .models import PostMention, PostTag, User
+
+TAG = re.compile(TAG_PATTERN)
+MENTION = re.compile(MENTION_PATTERN)
+
+
+def extract(text):
+    """Теги (в нижнем регистре) и имена упомянутых пользователей."""
+    return (
+        {tag.lower() for tag in TAG.findall(text)},
+        set(MENTION.findall(text)),
+    )
+
+
+def index_posts(posts):
+    """Переписывает индекс для постов.
+
+    posts - кортежи (id поста, дата публикации, теги, имена); имена
+    всех постов разрешаются в пользователей одним запросом."""
+    usernames = set()
+    for _, _, _, names in posts:
+        usernames |= names
+    user_ids = dict(
+        User.objects.filter(
+            username__in=usernames, is_active=True
+        ).values_list('username', 'pk')
+    ) if usernames else {}
+    post_ids = [post_id for post_id, _, _, _ in posts]
+    with transaction.atomic():
+        PostTag.objects.filter(post_id__in=post_ids).delete()
+        PostMention.objects.filter(post_id__in=post_ids).delete()
+        PostTag.objects.bulk_create(
+            PostTag(tag=tag, pub_date=pub_date, post_id=post_id)
+            for post_id, pub_date, tags, _ in posts
+            for tag in tags
+        )
+        PostMention.objects.bulk_create(
+            PostMention(user_id=user_ids[name], pub_date=pub_date,
+                        post_id=post_id)
+            for post_id, pub_date, _, names in posts
+            for name in names if name in user_ids
+        )
+
+
+def index_post(post):
+    index_posts([(post.pk, post.pub_date, *extract(post.text))])
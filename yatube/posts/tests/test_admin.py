@@ -0,0 +1,80 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ..admin import PostAdmin
+from ..models import Comment, Group, Post
+
+User = get_user_model()
+
+
+class AdminChangelistTest(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser(
+            username='admin', email='admin@example.com', password='1234567'
+        )
+        self.client.force_login(self.admin)
+
+    def add_rows(self, count):
+        for index in range(count):
+            group = Group.objects.create(title=f'Группа {index}',
+                                         slug=f'slug-{len(self.slugs)}',
+                                         description='Описание')
+            self.slugs.append(group.slug)
+            author = User.objects.create_user(
+                username=f'user-{len(self.slugs)}'
+            )
+            post = Post.objects.create(author=author, group=group,
+                                       text='Тестовый пост')
+            Comment.objects.create(post=post, author=author, text='Коммент')
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(context)
+
+    def test_changelist_queries_do_not_grow(self):
+        """Число запросов списка не зависит от числа строк."""
+        self.slugs = []
+        for model in ('post', 'comment'):
+            with self.subTest(model=model):
+                url = reverse(f'admin:posts_{model}_changelist')
+                self.add_rows(2)
+                self.count_queries(url)
+                few = self.count_queries(url)
+                self.add_rows(5)
+                self.assertEqual(self.count_queries(url), few)
+
+    @override_settings(ADMIN_EXACT_COUNT_LIMIT=1)
+    def test_estimated_count(self):
+        """Большая таблица без фильтров - оценка по статистике ANALYZE
+        вместо COUNT(*), а не максимальный pk."""
+        self.slugs = []
+        self.add_rows(3)
+        Post.objects.filter(pk=Post.objects.first().pk).delete()
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE posts_post')
+        response = self.client.get(reverse('admin:posts_post_changelist'))
+        self.assertEqual(response.context['cl'].result_count, 2)
+
+    @override_settings(ADMIN_EXACT_COUNT_LIMIT=3)
+    def test_pages_past_count_limit(self):
+        """Страницы за пределом подсчёта открываются, пока есть строки."""
+        self.slugs = []
+        self.add_rows(7)
+        url = reverse('admin:posts_post_changelist')
+        with mock.patch.object(PostAdmin, 'list_per_page', 2):
+            response = self.client.get(url, {'q': 'Тестовый', 'p': 2})
+            self.assertEqual(response.status_code, 200)
+            cl = response.context['cl']
+            self.assertEqual(len(cl.result_list), 2)
+            self.assertEqual(cl.paginator.num_pages, 4)
+            response = self.client.get(url, {'q': 'Тестовый', 'p': 3})
+            self.assertEqual(len(response.context['cl'].result_list), 1)
+            response = self.client.get(url, {'q': 'Тестовый', 'p': 4})
+            self.assertEqual(response.status_code, 302)
@@ -0,0 +1,116 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from ..models import (ArchivedComment, ArchivedPost, Comment, Group, Like,
+                      Post, PostMention, PostTag, PostViewDaily)
+from ..utils import ChainedPosts
+
+User = get_user_model()
+
+
+@override_settings(LIMIT=3)
+class ArchiveTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='auth')
+        self.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        posts = [
+            Post.objects.create(text=f'Тестовый пост{i}', author=self.user,
+                                group=self.group)
+            for i in range(5)
+        ]
+        self.old = posts[:3]
+        Post.objects.filter(pk__in=[post.pk for post in self.old]).update(
+            pub_date=timezone.now() - timedelta(days=400)
+        )
+        Comment.objects.create(post=self.old[0], author=self.user,
+                               text='Коммент')
+        pub_date = self.old[0].pub_date
+        PostTag.objects.create(post=self.old[0], tag='тег',
+                               pub_date=pub_date)
+        PostMention.objects.create(post=self.old[0], user=self.user,
+                                   pub_date=pub_date)
+        Like.objects.create(post=self.old[0], user=self.user)
+        PostViewDaily.objects.create(post=self.old[0], day=pub_date.date(),
+                                     views=7)
+
+    def archive(self):
+        out = StringIO()
+        call_command('archive_posts', batch_size=2, stdout=out)
+        return out.getvalue()
+
+    def test_command_moves_old_posts(self):
+        """Старые посты и их комментарии переносятся с теми же id."""
+        self.assertIn('3', self.archive())
+        self.assertEqual(Post.objects.count(), 2)
+        self.assertEqual(
+            set(ArchivedPost.objects.values_list('pk', flat=True)),
+            {post.pk for post in self.old}
+        )
+        self.assertEqual(
+            ArchivedComment.objects.get().post_id, self.old[0].pk
+        )
+        self.assertIn('0', self.archive())
+
+    def test_related_rows_moved(self):
+        """Теги, упоминания, лайки и просмотры переносятся с постом."""
+        self.archive()
+        post = ArchivedPost.objects.get(pk=self.old[0].pk)
+        self.assertEqual(post.tags.get().tag, 'тег')
+        self.assertEqual(post.mentions.get().user, self.user)
+        self.assertEqual(post.likes.get().user, self.user)
+        self.assertEqual(post.daily_views.get().views, 7)
+        self.assertFalse(PostTag.objects.exists())
+
+    def test_archive_count_cached(self):
+        """Архив пересчитывается только после archive_posts."""
+        self.archive()
+        posts = ChainedPosts(Post.objects.all(), ArchivedPost.objects.all())
+        self.assertEqual(posts.count(), 5)
+        posts = ChainedPosts(Post.objects.all(), ArchivedPost.objects.all())
+        with self.assertNumQueries(1):
+            self.assertEqual(posts.count(), 5)
+        Post.objects.update(pub_date=timezone.now() - timedelta(days=400))
+        self.archive()
+        posts = ChainedPosts(Post.objects.all(), ArchivedPost.objects.all())
+        with self.assertNumQueries(2):
+            self.assertEqual(posts.count(), 5)
+
+    def test_pages_read_through_archive(self):
+        """Страницы автора и группы продолжаются архивом."""
+        self.archive()
+        for url in (
+            reverse('posts:profile', kwargs={'username': 'auth'}),
+            reverse('posts:group_list', kwargs={'slug': 'test-slug'}),
+        ):
+            first = self.client.get(url).context['page_obj']
+            second = self.client.get(url, {'page': 2}).context['page_obj']
+            self.assertEqual(first.paginator.count, 5)
+            self.assertIsInstance(first[0], Post)
+            self.assertIsInstance(first[2], ArchivedPost)
+            self.assertEqual(len(second), 2)
+        response = self.client.get(
+            reverse('posts:post_detail', kwargs={'post_id': self.old[0].pk})
+        )
+        self.assertContains(response, 'Коммент')
+        self.assertNotContains(response, 'Добавить комментарий')
+
+    def test_api_cursor_reads_archive(self):
+        self.archive()
+        url = reverse('api:profile', kwargs={'username': 'auth'})
+        first = self.client.get(url).json()
+        second = self.client.get(url, {'cursor': first['next']}).json()
+        ids = [post['id'] for post in first['results'] + second['results']]
+        self.assertEqual(len(set(ids)), 5)
+        self.assertIsNone(second['next'])
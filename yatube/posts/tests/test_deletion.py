@@ -0,0 +1,93 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from jobs.models import Job
+from jobs.worker import run_pending
+from .. import deletion
+from ..models import (Comment, Deletion, Follow, Group, Like, Post,
+                      PostMention, PostTag)
+
+User = get_user_model()
+
+
+@override_settings(DELETION_BATCH_SIZE=2)
+class BackgroundDeletionTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username='auth')
+        self.reader = User.objects.create_user(username='reader')
+        self.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        self.posts = Post.objects.bulk_create([
+            Post(text=f'Тестовый пост{i}', author=self.author,
+                 group=self.group)
+            for i in range(5)
+        ])
+        self.post = Post.objects.create(text='Пост читателя',
+                                        author=self.reader, group=self.group)
+        Comment.objects.create(post=self.post, author=self.author,
+                               text='Коммент')
+        Follow.objects.create(user=self.reader, author=self.author)
+        tagged = Post.objects.filter(author=self.author).first()
+        PostTag.objects.create(tag='тег', post=tagged,
+                               pub_date=tagged.pub_date)
+        PostMention.objects.create(user=self.author, post=self.post,
+                                   pub_date=self.post.pub_date)
+        Like.objects.create(user=self.author, post=self.post)
+        Post.objects.filter(pk=self.post.pk).update(like_count=1)
+
+    def test_user_hidden_then_purged(self):
+        """Автор сразу пропадает со страниц, строки удаляются пачками."""
+        task = deletion.schedule(self.author)
+        # Запрос только помечает автора, строки считает задача.
+        self.assertEqual(task.total, 0)
+        response = self.client.get(reverse('posts:index'))
+        self.assertEqual(len(response.context['page_obj']), 1)
+        response = self.client.get(
+            reverse('posts:profile', kwargs={'username': 'auth'})
+        )
+        self.assertEqual(response.status_code, 404)
+        self.assertTrue(User.objects.filter(username='auth').exists())
+        self.assertGreater(run_pending(), 2)
+        task.refresh_from_db()
+        self.assertEqual(task.status, Deletion.DONE)
+        self.assertEqual(task.progress, 100)
+        self.assertFalse(User.objects.filter(username='auth').exists())
+        self.assertEqual(Post.objects.count(), 1)
+        self.assertFalse(Follow.objects.exists())
+        self.assertFalse(PostTag.objects.exists())
+        self.assertFalse(PostMention.objects.exists())
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.comment_count, 0)
+        # Лайк удалённого автора уходит и из счётчика чужого поста.
+        Job.objects.filter(status=Job.PENDING).update(run_at=timezone.now())
+        run_pending()
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.like_count, 0)
+
+    def test_group_posts_are_kept(self):
+        """У постов удалённой группы сбрасывается группа."""
+        deletion.schedule(self.group)
+        response = self.client.get(
+            reverse('posts:group_list', kwargs={'slug': 'test-slug'})
+        )
+        self.assertEqual(response.status_code, 404)
+        run_pending()
+        self.assertFalse(Group.objects.exists())
+        self.assertEqual(Post.objects.filter(group=None).count(), 6)
+
+    def test_post(self):
+        deletion.schedule(self.post)
+        response = self.client.get(
+            reverse('posts:post_detail', kwargs={'post_id': self.post.pk})
+        )
+        self.assertEqual(response.status_code, 404)
+        run_pending()
+        self.assertFalse(Post.objects.filter(pk=self.post.pk).exists())
+        self.assertFalse(Comment.objects.exists())
@@ -65,6 +65,42 @@ class PostFormTest(TestCase):
         )
         self.assertRedirects(response, '/auth/login/?next=/create/')
 
+    def test_group_widget_renders_only_selected(self):
+        """Форма не выгружает все группы в <select>."""
+        for index in range(5):
+            Group.objects.create(title=f'Группа {index}', slug=f'slug-{index}',
+                                 description='Описание')
+        response = self.authorized_client.get(reverse('posts:post_create'))
+        self.assertContains(response, '<option', count=1)
+        self.assertContains(response, 'data-autocomplete-url')
+
+    def test_invalid_group_rerenders_form(self):
+        """Мусор вместо id группы - ошибка формы, а не 500."""
+        response = self.authorized_client.post(
+            reverse('posts:post_create'),
+            data={'text': 'Текст', 'group': 'abc'}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.context['form'].errors['group'])
+        # Выбранная группа невалидной формы остаётся в <select>.
+        response = self.authorized_client.post(
+            reverse('posts:post_create'),
+            data={'text': '', 'group': self.group.pk}
+        )
+        self.assertContains(response, self.group.title)
+
+    def test_deleted_group_rejected(self):
+        """Группу, помеченную удалённой, выбрать уже нельзя."""
+        group = Group.objects.create(title='Удалённая', slug='deleted',
+                                     description='Описание',
+                                     is_deleted=True)
+        response = self.authorized_client.post(
+            reverse('posts:post_create'),
+            data={'text': 'Текст', 'group': group.pk}
+        )
+        self.assertTrue(response.context['form'].errors['group'])
+        self.assertFalse(Post.objects.exists())
+
     def test_post_edit(self):
         """Валидная форма изменяет запись в Post."""
         self.post = Post.objects.create(
@@ -0,0 +1,65 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from jobs.models import Job
+from jobs.worker import run_pending
+from ..models import Like, Post, TrendingScore
+
+User = get_user_model()
+
+
+class LikeTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='auth')
+        self.post = Post.objects.create(author=self.user, text='Пост')
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def like(self, client, name='posts:post_like'):
+        return client.post(reverse(name, kwargs={'post_id': self.post.pk}))
+
+    def test_likes_are_counted_in_background(self):
+        """Лайки пишутся сразу, счётчик - одной отложенной задачей."""
+        self.like(self.authorized_client)
+        self.like(self.authorized_client)
+        reader = User.objects.create_user(username='reader')
+        reader_client = Client()
+        reader_client.force_login(reader)
+        self.like(reader_client)
+        self.assertEqual(Like.objects.count(), 2)
+        self.assertEqual(Job.objects.count(), 1)
+        self.assertTrue(
+            TrendingScore.objects.filter(post=self.post).exists()
+        )
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.like_count, 0)
+        Job.objects.update(run_at=timezone.now())
+        run_pending()
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.like_count, 2)
+        response = self.authorized_client.get(
+            reverse('posts:post_detail', kwargs={'post_id': self.post.pk})
+        )
+        self.assertTrue(response.context['liked'])
+        self.assertContains(response, 'Нравится: 2')
+
+    def test_get_not_allowed(self):
+        response = self.authorized_client.get(
+            reverse('posts:post_like', kwargs={'post_id': self.post.pk})
+        )
+        self.assertEqual(response.status_code, 405)
+        self.assertFalse(Like.objects.exists())
+
+    def test_unlike(self):
+        self.like(self.authorized_client)
+        cache.clear()
+        self.like(self.authorized_client, 'posts:post_unlike')
+        self.assertFalse(Like.objects.exists())
+        Job.objects.update(run_at=timezone.now())
+        run_pending()
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.like_count, 0)
@@ -0,0 +1,65 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.http import Http404
+from django.test import TestCase
+
+from .. import lookups
+from ..models import Group
+
+User = get_user_model()
+
+
+class LookupCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+
+    def test_cached_lookup(self):
+        """Повторный поиск не обращается к базе."""
+        self.assertEqual(lookups.groups.get_or_404('test-slug'), self.group)
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                lookups.groups.get_or_404('test-slug'), self.group
+            )
+
+    def test_user_without_secrets(self):
+        """В общий кэш не попадают хэш пароля и почта."""
+        User.objects.create_user(username='auth', password='secret',
+                                 email='auth@example.com')
+        lookups.users.get_or_404('auth')
+        cached = cache.get(lookups.users.prefix + 'auth')
+        self.assertEqual(cached.username, 'auth')
+        self.assertTrue(
+            {'password', 'email'} <= cached.get_deferred_fields()
+        )
+
+    def test_negative_lookup(self):
+        """Отсутствующий slug тоже кэшируется и сбрасывается при
+        создании группы."""
+        with self.assertRaises(Http404):
+            lookups.groups.get_or_404('new-slug')
+        with self.assertNumQueries(0), self.assertRaises(Http404):
+            lookups.groups.get_or_404('new-slug')
+        group = Group.objects.create(title='Новая', slug='new-slug',
+                                     description='Описание')
+        self.assertEqual(lookups.groups.get_or_404('new-slug'), group)
+
+    def test_rename_invalidates(self):
+        """После смены slug и username старые значения не находятся."""
+        lookups.groups.get_or_404('test-slug')
+        self.group.slug = 'renamed'
+        self.group.save()
+        with self.assertRaises(Http404):
+            lookups.groups.get_or_404('test-slug')
+        self.assertEqual(lookups.groups.get_or_404('renamed'), self.group)
+        user = User.objects.create_user(username='auth')
+        lookups.users.get_or_404('auth')
+        user.username = 'author'
+        user.save()
+        with self.assertRaises(Http404):
+            lookups.users.get_or_404('auth')
+        self.assertEqual(lookups.users.get_or_404('author'), user)
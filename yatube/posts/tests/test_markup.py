@@ -0,0 +1,94 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from .. import markup
+from ..models import Comment, Post
+
+User = get_user_model()
+
+
+class MarkupTest(TestCase):
+    def test_render(self):
+        """Разметка переводится в HTML, пользовательский HTML
+        экранируется."""
+        self.assertEqual(
+            markup.render('**Жирный** и *курсив*\nс `<b>кодом</b>`'),
+            '<p><strong>Жирный</strong> и <em>курсив</em><br>'
+            'с <code>&lt;b&gt;кодом&lt;/b&gt;</code></p>'
+        )
+        self.assertEqual(
+            markup.render('<script>alert(1)</script>\n\n@auth'),
+            '<p>&lt;script&gt;alert(1)&lt;/script&gt;</p>\n'
+            '<p><a href="/profile/auth/">@auth</a></p>'
+        )
+        self.assertEqual(
+            markup.render('[сайт](https://example.com), https://ya.ru.'),
+            '<p><a href="https://example.com" rel="nofollow noopener">'
+            'сайт</a>, <a href="https://ya.ru" rel="nofollow noopener">'
+            'https://ya.ru</a>.</p>'
+        )
+        self.assertNotIn(
+            '<a', markup.render('[плохо](javascript:alert(1))')
+        )
+
+
+class RenderedTextTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='auth')
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def test_forms_store_html(self):
+        """HTML считается при сохранении формы и выводится как есть."""
+        self.authorized_client.post(
+            reverse('posts:post_create'), {'text': '**Пост**'}
+        )
+        post = Post.objects.get()
+        self.assertEqual(post.text_html, '<p><strong>Пост</strong></p>')
+        self.assertEqual(post.text_html_version, markup.RENDERER_VERSION)
+        self.authorized_client.post(
+            reverse('posts:add_comment', kwargs={'post_id': post.pk}),
+            {'text': '*Коммент*'}
+        )
+        self.assertEqual(Comment.objects.get().text_html,
+                         '<p><em>Коммент</em></p>')
+        response = self.client.get(
+            reverse('posts:post_detail', kwargs={'post_id': post.pk})
+        )
+        self.assertContains(response, '<strong>Пост</strong>')
+        self.assertContains(response, '<em>Коммент</em>')
+
+    def test_any_save_renders(self):
+        """HTML и начало для лент пересчитываются и при сохранении мимо
+        форм, например из админки."""
+        post = Post.objects.create(text='first **bold**', author=self.user)
+        post.text = 'edited *text*'
+        post.save()
+        post.refresh_from_db()
+        self.assertEqual(post.text_html, '<p>edited <em>text</em></p>')
+        post.text = '**Снова**'
+        post.save(update_fields=['text'])
+        post.refresh_from_db()
+        self.assertEqual(post.excerpt_html, '<p><strong>Снова</strong></p>')
+        response = self.client.get(reverse('posts:index'))
+        self.assertContains(response, '<strong>Снова</strong>')
+        self.assertNotContains(response, '**Снова**')
+
+    def test_rerender_command(self):
+        post = Post.objects.create(text='**Пост**', author=self.user)
+        Post.objects.create(text='Актуальный', author=self.user)
+        Post.objects.filter(pk=post.pk).update(
+            text_html='', excerpt_html='', text_html_version=0
+        )
+        out = StringIO()
+        call_command('rerender_text', processes=1, stdout=out)
+        self.assertIn('Post: обновлено 1', out.getvalue())
+        post.refresh_from_db()
+        self.assertEqual(post.text_html, '<p><strong>Пост</strong></p>')
+        self.assertEqual(post.excerpt_html, post.text_html)
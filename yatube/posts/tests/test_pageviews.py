@@ -0,0 +1,41 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from .. import pageviews
+from ..models import Post, PostViewDaily
+
+User = get_user_model()
+
+
+class PageViewsTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        pageviews.buffer.drain()
+        self.user = User.objects.create_user(username='auth')
+        self.post = Post.objects.create(author=self.user, text='Пост')
+        self.url = reverse(
+            'posts:post_detail', kwargs={'post_id': self.post.pk}
+        )
+
+    def test_views_are_buffered(self):
+        """Просмотр не пишет в базу, повтор сессии не считается."""
+        client = Client()
+        client.force_login(self.user)
+        client.get(self.url)
+        client.get(self.url)
+        self.client.get(self.url, REMOTE_ADDR='10.0.0.1')
+        self.assertFalse(PostViewDaily.objects.exists())
+        self.assertEqual(pageviews.buffer.flush(), 2)
+        self.assertEqual(PostViewDaily.objects.get().views, 2)
+        self.client.get(self.url, REMOTE_ADDR='10.0.0.2')
+        pageviews.buffer.flush()
+        self.assertEqual(PostViewDaily.objects.get().views, 3)
+        response = self.client.get(self.url, REMOTE_ADDR='10.0.0.3')
+        self.assertContains(response, 'Просмотров: 3')
+
+    def test_flush_skips_deleted_posts(self):
+        pageviews.buffer.add(self.post.pk + 100)
+        self.assertEqual(pageviews.buffer.flush(), 1)
+        self.assertFalse(PostViewDaily.objects.exists())
@@ -0,0 +1,88 @@
+import io
+import shutil
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files import File
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.template.loader import render_to_string
+from django.test import TestCase, override_settings
+from PIL import Image
+
+from ..models import Post
+
+User = get_user_model()
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+
+def red_png(name='red.png'):
+    buffer = io.BytesIO()
+    Image.new('RGB', (96, 34), (200, 0, 0)).save(buffer, 'PNG')
+    return SimpleUploadedFile(name, buffer.getvalue(), 'image/png')
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class PlaceholderTest(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='auth')
+
+    def test_computed_on_image_change(self):
+        """Заглушка считается при смене картинки и только тогда."""
+        post = Post.objects.create(
+            text='Пост', author=self.user, image=red_png()
+        )
+        self.assertEqual(post.image_color, '#c80000')
+        self.assertTrue(post.image_preview.startswith('data:image/png'))
+        post = Post.objects.get(pk=post.pk)
+        with mock.patch('posts.placeholders.read') as read:
+            post.text = 'Новый текст'
+            post.save()
+        read.assert_not_called()
+        post.image = None
+        post.save()
+        self.assertEqual((post.image_color, post.image_preview), ('', ''))
+
+    def test_not_an_image(self):
+        image_mock = mock.MagicMock(spec=File)
+        image_mock.name = 'image_mock'
+        post = Post.objects.create(
+            text='Пост', author=self.user, image=image_mock
+        )
+        self.assertEqual(post.image_color, '')
+
+    def test_template_inlines_placeholder(self):
+        post = Post.objects.create(
+            text='Пост', author=self.user, image=red_png()
+        )
+        thumbnail = mock.Mock(url='/media/cache/red.png', width=960,
+                              height=339)
+        html = render_to_string(
+            'includes/post_image.html', {'post': post, 'im': thumbnail}
+        )
+        self.assertIn('loading="lazy"', html)
+        self.assertIn('width="960" height="339"', html)
+        self.assertIn('background: #c80000 url(data:image/png', html)
+
+    def test_backfill(self):
+        post = Post.objects.create(
+            text='Пост', author=self.user, image=red_png()
+        )
+        Post.objects.create(text='Без картинки', author=self.user)
+        Post.objects.update(image_color='', image_preview='')
+        out = StringIO()
+        call_command('backfill_placeholders', processes=1, stdout=out)
+        self.assertIn('Post: обновлено 1', out.getvalue())
+        post.refresh_from_db()
+        self.assertEqual(post.image_color, '#c80000')
@@ -0,0 +1,90 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from ..models import Group, Post
+from ..readmodels import PostRow, feed_queryset, feed_rows
+
+User = get_user_model()
+
+
+class ReadModelsTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(
+            username='auth', first_name='Лев', last_name='Толстой'
+        )
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        Post.objects.create(text='Пост в группе', author=cls.user,
+                            group=cls.group, image='posts/small.gif')
+        Post.objects.create(text='Пост без группы', author=cls.user)
+
+    def test_rows(self):
+        """Строки отдают те же атрибуты, что читает карточка поста."""
+        with self.assertNumQueries(1):
+            rows = feed_rows(Post.objects.order_by('pk'))
+        post = Post.objects.order_by('pk').first()
+        row = rows[0]
+        self.assertIsInstance(row, PostRow)
+        self.assertEqual(row.pk, post.pk)
+        self.assertEqual(row.excerpt, post.text)
+        self.assertEqual(row.image.name, post.image.name)
+        self.assertEqual(str(row.author), 'auth')
+        self.assertEqual(row.author.get_full_name(), 'Лев Толстой')
+        self.assertEqual(row.group.slug, 'test-slug')
+        self.assertIsNone(rows[1].group)
+        self.assertIs(rows[0].author, rows[1].author)
+
+    def test_feed_queryset_defers_columns(self):
+        post = feed_queryset(Post.objects.all()).first()
+        self.assertEqual(
+            post.author.get_deferred_fields() & {'password', 'email'},
+            {'password', 'email'}
+        )
+
+    def test_bench_command(self):
+        out = StringIO()
+        call_command('bench_feed', number=1, stdout=out)
+        self.assertIn('строки', out.getvalue())
+
+
+@override_settings(EXCERPT_LENGTH=20)
+class ExcerptTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='auth')
+        self.text = 'Длинный текст поста ' * 5 + 'с хвостом'
+
+    def test_excerpt_on_save(self):
+        """Ленты показывают начало текста, страница поста - весь текст."""
+        post = Post.objects.create(text=self.text, author=self.user)
+        self.assertEqual(post.excerpt, 'Длинный текст поста…')
+        self.assertTrue(post.has_more)
+        response = self.client.get(reverse('posts:index'))
+        self.assertContains(response, 'Длинный текст поста…')
+        self.assertNotContains(response, 'с хвостом')
+        self.assertNotIn('text', response.context['page_obj'][0].__dict__)
+        response = self.client.get(
+            reverse('posts:post_detail', kwargs={'post_id': post.pk})
+        )
+        self.assertContains(response, 'с хвостом')
+        post.text = 'Короткий'
+        post.save(update_fields=['text'])
+        post.refresh_from_db()
+        self.assertEqual((post.excerpt, post.has_more), ('Короткий', False))
+
+    def test_backfill_command(self):
+        Post.objects.bulk_create([Post(text=self.text, author=self.user)])
+        out = StringIO()
+        call_command('backfill_excerpts', stdout=out)
+        self.assertIn('Post: обновлено 1', out.getvalue())
+        self.assertTrue(Post.objects.get().has_more)
@@ -0,0 +1,74 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from ..models import Comment, Post
+from ..utils import delete_comments
+
+User = get_user_model()
+
+
+class CommentCountTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='auth')
+        self.post = Post.objects.create(author=self.user, text='Тестовый пост')
+
+    def test_counters_follow_comments(self):
+        """Счётчик и дата последнего комментария ведутся сигналами."""
+        first, second = (
+            Comment.objects.create(post=self.post, author=self.user,
+                                   text=text)
+            for text in ('Первый', 'Второй')
+        )
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.comment_count, 2)
+        self.assertEqual(self.post.last_comment_at, second.created)
+        second.delete()
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.comment_count, 1)
+        self.assertEqual(self.post.last_comment_at, first.created)
+
+    def test_counter_never_negative(self):
+        """Комментарий, не учтённый счётчиком, удаляется без ошибки."""
+        comment = Comment.objects.create(post=self.post, author=self.user,
+                                         text='Коммент')
+        Post.objects.update(comment_count=0)
+        comment.delete()
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.comment_count, 0)
+
+    def test_delete_comments_in_bulk(self):
+        """Пачка удаляется без запросов на каждый комментарий."""
+        other = User.objects.create_user(username='other')
+        for index in range(5):
+            Comment.objects.create(post=self.post, author=other,
+                                   text=f'Коммент {index}')
+        kept = Comment.objects.create(post=self.post, author=self.user,
+                                      text='Остаётся')
+        with self.assertNumQueries(3):
+            delete_comments(Comment.objects.filter(author=other))
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.comment_count, 1)
+        self.assertEqual(self.post.last_comment_at, kept.created)
+
+    def test_rebuild_command(self):
+        comment = Comment.objects.create(post=self.post, author=self.user,
+                                         text='Коммент')
+        Post.objects.update(comment_count=0, last_comment_at=None)
+        call_command('rebuild_comment_counts', stdout=StringIO())
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.comment_count, 1)
+        self.assertEqual(self.post.last_comment_at, comment.created)
+
+    def test_list_page_without_extra_queries(self):
+        """Лента показывает счётчик без запросов на каждый пост."""
+        Comment.objects.create(post=self.post, author=self.user,
+                               text='Коммент')
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('posts:index'))
+        self.assertContains(response, 'Комментариев: 1')
@@ -0,0 +1,76 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..models import Comment, Follow, FollowSuggestion, Post
+from ..suggestions import FollowGraph
+
+User = get_user_model()
+
+
+class FollowSuggestionTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user, cls.friend, cls.friend_of_friend, cls.commenter = (
+            User.objects.create_user(username=name)
+            for name in ('user', 'friend', 'friend_of_friend', 'commenter')
+        )
+        Follow.objects.create(user=cls.user, author=cls.friend)
+        Follow.objects.create(user=cls.friend, author=cls.friend_of_friend)
+        post = Post.objects.create(author=cls.friend, text='Тестовый пост')
+        for author in (cls.user, cls.commenter):
+            Comment.objects.create(post=post, author=author, text='Коммент')
+
+    def test_graph_scores(self):
+        """Друзья друзей и соседи по комментариям, без себя и
+        уже подписанных."""
+        graph = FollowGraph()
+        batch = next(graph.batches())
+        suggested = {
+            (user, candidate): score
+            for user, candidate, score in graph.top(batch, 10)
+        }
+        self.assertIn((self.user.pk, self.friend_of_friend.pk), suggested)
+        self.assertIn((self.user.pk, self.commenter.pk), suggested)
+        self.assertNotIn((self.user.pk, self.friend.pk), suggested)
+        self.assertNotIn((self.user.pk, self.user.pk), suggested)
+
+    def test_top_k(self):
+        """Из кандидатов пользователя остаются k лучших."""
+        graph = FollowGraph()
+        batch = next(graph.batches())
+        suggested = [
+            (candidate, score) for user, candidate, score
+            in graph.top(batch, 1) if user == self.user.pk
+        ]
+        self.assertEqual(suggested, [(self.friend_of_friend.pk, 1.0)])
+
+    def test_command_and_views(self):
+        """Команда сохраняет рекомендации, страницы их показывают."""
+        call_command('build_follow_suggestions', top=1, stdout=StringIO())
+        self.assertEqual(
+            FollowSuggestion.objects.get(user=self.user).suggested,
+            self.friend_of_friend
+        )
+        client = Client()
+        client.force_login(self.user)
+        for url in (
+            reverse('posts:follow_index'),
+            reverse('posts:profile', kwargs={'username': 'friend'}),
+        ):
+            with self.subTest(url=url):
+                response = client.get(url)
+                self.assertEqual(
+                    response.context['suggestions'][0].suggested,
+                    self.friend_of_friend
+                )
+        # Удаляемый пользователь пропадает из рекомендаций сразу.
+        User.objects.filter(pk=self.friend_of_friend.pk).update(
+            is_active=False
+        )
+        response = client.get(reverse('posts:follow_index'))
+        self.assertFalse(response.context['suggestions'])
@@ -0,0 +1,70 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..models import Post, PostMention, PostTag
+
+User = get_user_model()
+
+
+class TagsTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='auth')
+        self.reader = User.objects.create_user(username='reader')
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def test_index_on_create_and_edit(self):
+        """Теги и упоминания попадают в индекс и обновляются при правке."""
+        self.authorized_client.post(
+            reverse('posts:post_create'),
+            {'text': 'Пишу про #Django для @reader и @nobody'}
+        )
+        post = Post.objects.get()
+        self.assertEqual(
+            list(PostTag.objects.values_list('tag', 'post')),
+            [('django', post.pk)]
+        )
+        self.assertEqual(
+            list(PostMention.objects.values_list('user', flat=True)),
+            [self.reader.pk]
+        )
+        self.assertIn('href="/tags/django/"', post.text_html)
+        response = self.client.get(
+            reverse('posts:tag', kwargs={'tag': 'Django'})
+        )
+        self.assertEqual(list(response.context['page_obj']), [post])
+        response = self.client.get(
+            reverse('posts:mentions', kwargs={'username': 'reader'})
+        )
+        self.assertEqual(list(response.context['page_obj']), [post])
+        self.authorized_client.post(
+            reverse('posts:post_edit', kwargs={'post_id': post.pk}),
+            {'text': 'Теперь про #python'}
+        )
+        self.assertEqual(
+            list(PostTag.objects.values_list('tag', flat=True)), ['python']
+        )
+        self.assertFalse(PostMention.objects.exists())
+
+    def test_index_on_save(self):
+        """Посты, сохранённые мимо форм (админка), тоже индексируются."""
+        post = Post.objects.create(text='#один', author=self.user)
+        post.text = '#два'
+        post.save()
+        self.assertEqual(PostTag.objects.get().tag, 'два')
+
+    def test_backfill_command(self):
+        Post.objects.bulk_create(
+            [Post(text='#один #два @reader', author=self.user)]
+        )
+        out = StringIO()
+        call_command('index_tags', processes=1, stdout=out)
+        self.assertIn('1', out.getvalue())
+        self.assertEqual(PostTag.objects.count(), 2)
+        self.assertEqual(PostMention.objects.get().user, self.reader)
@@ -0,0 +1,124 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from sorl.thumbnail import default, get_thumbnail
+from sorl.thumbnail.images import ImageFile
+
+from .. import thumbnails
+from ..models import Post
+
+User = get_user_model()
+
+
+def store_thumbnail(image):
+    """Запись о готовой миниатюре, как после {% thumbnail %}."""
+    thumbnail = ImageFile(
+        thumbnails.thumbnail_name(
+            image, thumbnails.FEED_GEOMETRY, thumbnails.FEED_OPTIONS
+        ),
+        default.storage
+    )
+    thumbnail.set_size((960, 339))
+    default.kvstore.set(thumbnail)
+    return thumbnail
+
+
+class ThumbnailsTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='auth')
+        for index in range(3):
+            Post.objects.create(
+                text=f'Пост {index}', author=self.user,
+                image=f'posts/image{index}.gif'
+            )
+        Post.objects.create(text='Без картинки', author=self.user)
+        self.posts = list(Post.objects.all())
+        self.stored = [
+            store_thumbnail(post.image) for post in self.posts if post.image
+        ]
+        cache.clear()
+
+    def test_name_matches_sorl(self):
+        """thumbnail_name повторяет закрытые методы бэкенда sorl: при
+        обновлении sorl-thumbnail расхождение всплывёт здесь."""
+        images = [
+            Post.objects.create(
+                text='Пост', author=self.user, image=f'posts/missing.{ext}'
+            ).image
+            for ext in ('jpg', 'png', 'gif')
+        ]
+        for preserve_format in (False, True):
+            with override_settings(THUMBNAIL_PRESERVE_FORMAT=preserve_format):
+                for image in images:
+                    # Исходника нет на диске, а в KV-хранилище - записи:
+                    # sorl вычислит имя и вернёт миниатюру, не создавая.
+                    self.assertEqual(
+                        thumbnails.thumbnail_name(
+                            image, thumbnails.FEED_GEOMETRY,
+                            thumbnails.FEED_OPTIONS
+                        ),
+                        get_thumbnail(
+                            image, thumbnails.FEED_GEOMETRY,
+                            **thumbnails.FEED_OPTIONS
+                        ).name
+                    )
+
+    def test_one_round_trip_per_page(self):
+        """Страница целиком - один запрос к базе, потом - к кэшу."""
+        with mock.patch('posts.thumbnails.get_thumbnail') as get_thumbnail:
+            with self.assertNumQueries(1):
+                posts = thumbnails.resolve(self.posts)
+            with self.assertNumQueries(0):
+                thumbnails.resolve(self.posts)
+        get_thumbnail.assert_not_called()
+        self.assertEqual(
+            [post.thumbnail.url for post in posts if post.thumbnail],
+            [thumbnail.url for thumbnail in self.stored]
+        )
+        self.assertEqual(
+            [post.thumbnail for post in posts if not post.image], [None]
+        )
+
+    def test_only_missing_are_generated(self):
+        post = Post.objects.create(
+            text='Новый', author=self.user, image='posts/new.gif'
+        )
+        created = ImageFile('cache/new.jpg', default.storage)
+        created.set_size((960, 339))
+        with mock.patch('posts.thumbnails.get_thumbnail',
+                        return_value=created) as get_thumbnail:
+            posts = thumbnails.resolve([post, *self.posts])
+        get_thumbnail.assert_called_once_with(
+            post.image, thumbnails.FEED_GEOMETRY, **thumbnails.FEED_OPTIONS
+        )
+        self.assertEqual(posts[0].thumbnail, created)
+
+    def test_feed_uses_resolved_urls(self):
+        response = self.client.get(reverse('posts:index'))
+        for thumbnail in self.stored:
+            self.assertContains(response, f'src="{thumbnail.url}"')
+
+    def test_detail_skips_unreadable_image(self):
+        """Исходник не открылся - страница поста без картинки, не 500."""
+        post = Post.objects.create(
+            text='Битая', author=self.user, image='posts/broken.gif'
+        )
+        with mock.patch('posts.thumbnails.get_thumbnail',
+                        return_value=ImageFile('cache/broken.jpg')):
+            response = self.client.get(
+                reverse('posts:post_detail', kwargs={'post_id': post.pk})
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNone(response.context['post'].thumbnail)
+        self.assertNotContains(response, 'card-img')
+
+    def test_detail_uses_stored_thumbnail(self):
+        post = next(post for post in self.posts if post.image)
+        response = self.client.get(reverse(
+            'posts:post_detail', kwargs={'post_id': post.pk}
+        ))
+        self.assertContains(response, f'src="{self.stored[0].url}"')
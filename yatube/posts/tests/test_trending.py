@@ -0,0 +1,60 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from .. import trending
+from ..models import Comment, Like, Post, TrendingScore
+
+User = get_user_model()
+
+
+class TrendingTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='auth')
+        self.hot_post, self.old_post = (
+            Post.objects.create(author=self.user, text=text)
+            for text in ('Горячий пост', 'Старый пост')
+        )
+
+    def test_comments_update_score(self):
+        """Комментарий увеличивает рейтинг, страница показывает порядок."""
+        Comment.objects.create(post=self.hot_post, author=self.user,
+                               text='Коммент')
+        self.assertTrue(TrendingScore.objects.filter(
+            post=self.hot_post).exists())
+        day_ago = timezone.now() - timedelta(days=1)
+        for _ in range(3):
+            trending.register_engagement(self.old_post.pk, when=day_ago)
+        response = self.client.get(reverse('posts:trending'))
+        self.assertEqual(
+            [post.pk for post in response.context['posts']],
+            [self.hot_post.pk, self.old_post.pk]
+        )
+
+    def test_prune_and_rebuild(self):
+        """Остывшие посты вытесняются, rebuild считает по комментариям
+        и лайкам."""
+        long_ago = timezone.now() - timedelta(
+            seconds=settings.TRENDING_HALF_LIFE * 20
+        )
+        trending.register_engagement(self.old_post.pk, when=long_ago)
+        Comment.objects.create(post=self.hot_post, author=self.user,
+                               text='Коммент')
+        call_command('refresh_trending', stdout=StringIO())
+        self.assertEqual(
+            list(TrendingScore.objects.values_list('post', flat=True)),
+            [self.hot_post.pk]
+        )
+        TrendingScore.objects.all().delete()
+        Like.objects.create(post=self.old_post, user=self.user)
+        call_command('refresh_trending', rebuild=True, stdout=StringIO())
+        self.assertEqual(
+            set(TrendingScore.objects.values_list('post', flat=True)),
+            {self.hot_post.pk, self.old_post.pk}
+        )
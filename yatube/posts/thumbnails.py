@@ -0,0 +1,120 @@
+"""Миниатюры картинок для целой страницы ленты.
+
+Тег {% thumbnail %} на каждый пост отдельно спрашивает KV-хранилище
+sorl: запрос к кэшу, а при промахе ещё и к базе. Здесь имена миниатюр
+всех постов страницы вычисляются так же, как это делает бэкенд sorl,
+записи читаются одним cache.get_many (и одним запросом к базе для того,
+чего нет в кэше), а через get_thumbnail - то есть с созданием файла -
+проходят только посты, миниатюр которых в хранилище ещё нет.
+Шаблоны берут готовую миниатюру из post.thumbnail.
+
+Имя миниатюры считается закрытыми методами бэкенда sorl, поэтому
+версия sorl-thumbnail зафиксирована в requirements.txt, а тест
+test_name_matches_sorl сверяет имя с get_thumbnail.
+"""
+import logging
+
+from sorl.thumbnail import default, get_thumbnail
+from sorl.thumbnail.conf import defaults as default_settings
+from sorl.thumbnail.conf import settings
+from sorl.thumbnail.images import ImageFile, deserialize_image_file
+from sorl.thumbnail.kvstores.base import add_prefix
+from sorl.thumbnail.kvstores.cached_db_kvstore import EMPTY_VALUE
+from sorl.thumbnail.kvstores.cached_db_kvstore import KVStore
+from sorl.thumbnail.models import KVStore as KVStoreModel
+
+logger = logging.getLogger(__name__)
+
+# Миниатюра карточки поста: как в {% thumbnail post.image "960x339"
+# crop="center" upscale=True %}.
+FEED_GEOMETRY = '960x339'
+FEED_OPTIONS = {'crop': 'center', 'upscale': True}
+
+
+def thumbnail_name(image, geometry, options):
+    """Имя файла миниатюры - то же, что получит
+    ThumbnailBackend.get_thumbnail для этих аргументов."""
+    backend = default.backend
+    source = ImageFile(image)
+    options = dict(options)
+    if settings.THUMBNAIL_PRESERVE_FORMAT:
+        options.setdefault('format', backend._get_format(source))
+    for key, value in backend.default_options.items():
+        options.setdefault(key, value)
+    for key, attr in backend.extra_options:
+        value = getattr(settings, attr)
+        if value != getattr(default_settings, attr):
+            options.setdefault(key, value)
+    return backend._get_thumbnail_filename(source, geometry, options)
+
+
+def thumbnail_key(image, geometry, options):
+    """Ключ записи о миниатюре в KV-хранилище."""
+    name = thumbnail_name(image, geometry, options)
+    return add_prefix(ImageFile(name, default.storage).key)
+
+
+def get_many(keys):
+    """Записи KV-хранилища одним запросом к кэшу и не больше чем одним
+    к базе. Отсутствующие, как и в самом sorl, запоминаются в кэше."""
+    kv_cache = default.kvstore.cache
+    values = kv_cache.get_many(keys)
+    missing = [key for key in keys if key not in values]
+    if missing:
+        found = dict.fromkeys(missing, EMPTY_VALUE)
+        found.update(
+            KVStoreModel.objects.filter(key__in=missing)
+            .values_list('key', 'value')
+        )
+        kv_cache.set_many(found, settings.THUMBNAIL_CACHE_TIMEOUT)
+        values.update(found)
+    return {
+        key: value for key, value in values.items()
+        if value != EMPTY_VALUE
+    }
+
+
+def make_thumbnail(image, geometry, options):
+    """Миниатюра через sorl с созданием файла; ошибки - как в теге.
+
+    Если исходник не открылся, sorl отдаёт миниатюру без размеров:
+    такую не показываем вовсе."""
+    try:
+        thumbnail = get_thumbnail(image, geometry, **options)
+    except Exception:
+        if settings.THUMBNAIL_DEBUG:
+            raise
+        logger.exception('Не удалось создать миниатюру %s', image)
+        return None
+    return thumbnail if thumbnail.size else None
+
+
+def resolve(posts, geometry=FEED_GEOMETRY, options=FEED_OPTIONS):
+    """Заполняет post.thumbnail у всех постов (None - без картинки)."""
+    posts = list(posts)
+    with_image = [post for post in posts if post.image]
+    for post in posts:
+        post.thumbnail = None
+    if not isinstance(default.kvstore, KVStore):
+        # У других хранилищ нет общего кэша - спрашиваем по одному.
+        for post in with_image:
+            post.thumbnail = make_thumbnail(post.image, geometry, options)
+        return posts
+    keys = [
+        thumbnail_key(post.image, geometry, options) for post in with_image
+    ]
+    found = get_many(keys)
+    for post, key in zip(with_image, keys):
+        value = found.get(key)
+        post.thumbnail = (
+            deserialize_image_file(value) if value
+            else make_thumbnail(post.image, geometry, options)
+        )
+    return posts
+
+
+def resolve_page(page):
+    """resolve для страницы пагинатора; список постов страницы
+    вычисляется один раз и сохраняется в page.object_list."""
+    page.object_list = resolve(page.object_list)
+    return page
@@ -0,0 +1,72 @@
+import math
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Comment, Like, TrendingScore
+
+COMMENT_WEIGHT = 1.0
+LIKE_WEIGHT = 0.5
+DECAY = math.log(2) / settings.TRENDING_HALF_LIFE
+
+
+def event_score(when, weight):
+    """Вклад события в рейтинг в логарифмической шкале."""
+    return math.log(weight) + DECAY * when.timestamp()
+
+
+def log_add(a, b):
+    """log(exp(a) + exp(b)) без переполнения."""
+    high, low = max(a, b), min(a, b)
+    return high + math.log1p(math.exp(low - high))
+
+
+def current_threshold(now=None):
+    """Рейтинг, ниже которого пост уже не считается популярным."""
+    now = now or timezone.now()
+    return event_score(now, settings.TRENDING_MIN_SCORE)
+
+
+def register_engagement(post_id, weight=COMMENT_WEIGHT, when=None):
+    """Инкрементально добавляем событие к рейтингу поста."""
+    value = event_score(when or timezone.now(), weight)
+    with transaction.atomic():
+        row, created = TrendingScore.objects.select_for_update(
+        ).get_or_create(post_id=post_id, defaults={'score': value})
+        if not created:
+            row.score = log_add(row.score, value)
+            row.save(update_fields=['score'])
+
+
+def prune():
+    """Удаляем остывшие посты, чтобы таблица рейтинга оставалась
+    маленькой."""
+    return TrendingScore.objects.filter(
+        score__lt=current_threshold()
+    ).delete()[0]
+
+
+def rebuild(since):
+    """Пересчёт рейтинга по комментариям и лайкам, созданным после
+    since."""
+    scores = {}
+    events = (
+        (Comment.objects.filter(created__gte=since), COMMENT_WEIGHT),
+        (Like.objects.filter(created__gte=since), LIKE_WEIGHT),
+    )
+    for queryset, weight in events:
+        rows = queryset.values_list('post_id', 'created').order_by()
+        for post_id, created in rows.iterator():
+            value = event_score(created, weight)
+            scores[post_id] = (
+                log_add(scores[post_id], value) if post_id in scores
+                else value
+            )
+    with transaction.atomic():
+        TrendingScore.objects.all().delete()
+        TrendingScore.objects.bulk_create(
+            TrendingScore(post_id=post_id, score=score)
+            for post_id, score in scores.items()
+        )
+    return len(scores)
@@ -0,0 +1,173 @@
+"""Загрузка картинок по частям с докачкой.
+
+Клиент создаёт загрузку с размером и SHA-256 файла, затем отправляет
+части с указанием смещения. Тело запроса читается из потока блоками по
+UPLOAD_READ_SIZE и сразу пишется в файл на диске, поэтому память на
+загрузку не зависит от размера файла. После обрыва связи принятое
+сохраняется, и клиент продолжает с received. Последняя часть
+запускает проверку контрольной суммы, готовый файл прикрепляется к
+посту через хранилище медиафайлов.
+"""
+import fcntl
+import hashlib
+import os
+import re
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files import File
+from django.utils import timezone
+from PIL import Image
+
+from .models import ImageUpload
+
+SHA256 = re.compile(r'[0-9a-f]{64}')
+
+
+class UploadError(Exception):
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+def part_path(upload):
+    return os.path.join(settings.UPLOAD_TEMP_DIR, f'{upload.pk}.part')
+
+
+def create(user, filename, size, sha256):
+    filename = os.path.basename(str(filename or ''))[:100]
+    if not filename:
+        raise UploadError('Не указано имя файла')
+    if not isinstance(size, int) or size <= 0:
+        raise UploadError('Некорректный размер файла')
+    if size > settings.UPLOAD_MAX_SIZE:
+        raise UploadError('Файл слишком большой', status=413)
+    sha256 = str(sha256 or '').lower()
+    if not SHA256.fullmatch(sha256):
+        raise UploadError('Некорректная контрольная сумма')
+    os.makedirs(settings.UPLOAD_TEMP_DIR, exist_ok=True)
+    upload = ImageUpload.objects.create(
+        user=user, filename=filename, size=size, sha256=sha256
+    )
+    open(part_path(upload), 'wb').close()
+    return upload
+
+
+def copy(stream, file, length):
+    """Копируем до length байт блоками, возвращаем сколько записано."""
+    written = 0
+    try:
+        while written < length:
+            chunk = stream.read(
+                min(settings.UPLOAD_READ_SIZE, length - written)
+            )
+            if not chunk:
+                break
+            file.write(chunk)
+            written += len(chunk)
+    except OSError:
+        # Клиент отключился: докачает с нового смещения.
+        pass
+    file.flush()
+    return written
+
+
+def check_offset(upload, offset):
+    if upload.status != ImageUpload.PENDING:
+        raise UploadError('Загрузка уже завершена', status=409)
+    if offset != upload.received:
+        raise UploadError(
+            f'Ожидается смещение {upload.received}', status=409
+        )
+
+
+def write_chunk(upload, offset, stream, length):
+    """Пишем часть длиной length из потока stream со смещения offset.
+
+    Если поток оборвался, сохраняем то, что успело прийти."""
+    check_offset(upload, offset)
+    if offset + length > upload.size:
+        raise UploadError('Часть выходит за размер файла', status=413)
+    with open(part_path(upload), 'r+b') as file:
+        try:
+            fcntl.flock(file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            raise UploadError('Часть уже загружается', status=409)
+        # Пока строка читалась, часть мог дописать другой запрос:
+        # сверяемся с базой уже под блокировкой файла.
+        upload.refresh_from_db(fields=['received', 'status'])
+        check_offset(upload, offset)
+        # Хвост от оборванной ранее записи не учтён в received.
+        file.truncate(offset)
+        file.seek(offset)
+        written = copy(stream, file, length)
+        updated = ImageUpload.objects.filter(
+            pk=upload.pk, received=offset
+        ).update(received=offset + written)
+        if not updated:
+            raise UploadError('Часть уже загружается', status=409)
+        upload.received = offset + written
+    if upload.received == upload.size:
+        finish(upload)
+    return upload
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    size = settings.UPLOAD_READ_SIZE
+    with open(path, 'rb') as file:
+        for block in iter(lambda: file.read(size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def fail(upload, message):
+    upload.status = ImageUpload.FAILED
+    upload.save(update_fields=['status'])
+    os.remove(part_path(upload))
+    raise UploadError(message, status=422)
+
+
+def finish(upload):
+    """Проверяем контрольную сумму и то, что это картинка."""
+    path = part_path(upload)
+    if file_sha256(path) != upload.sha256:
+        fail(upload, 'Контрольная сумма не совпадает')
+    try:
+        with Image.open(path) as image:
+            image.verify()
+    except Exception:
+        fail(upload, 'Файл не является картинкой')
+    upload.status = ImageUpload.COMPLETE
+    upload.save(update_fields=['status'])
+
+
+def attach(upload, post):
+    if upload.status != ImageUpload.COMPLETE:
+        raise UploadError('Загрузка не завершена', status=409)
+    path = part_path(upload)
+    with open(path, 'rb') as file:
+        post.image.save(upload.filename, File(file))
+    os.remove(path)
+    upload.status = ImageUpload.ATTACHED
+    upload.post = post
+    upload.save(update_fields=['status', 'post'])
+    return post
+
+
+def discard(queryset):
+    """Удаляем загрузки вместе с недокачанными файлами."""
+    count = 0
+    for upload in queryset.iterator():
+        if os.path.exists(part_path(upload)):
+            os.remove(part_path(upload))
+        count += 1
+    queryset.delete()
+    return count
+
+
+def cleanup(seconds):
+    """Удаляем брошенные загрузки старше seconds секунд."""
+    return discard(ImageUpload.objects.filter(
+        created__lt=timezone.now() - timedelta(seconds=seconds)
+    ).exclude(status=ImageUpload.ATTACHED))
@@ -1,9 +1,183 @@
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from django.core.cache import cache
 from django.core.paginator import Paginator
 from django.conf import settings
+from django.db import connections
+from django.db.models import Count, Max, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils.functional import cached_property
+
+from . import thumbnails
+from .models import Comment, Post
+
+LATEST_POST_KEY = 'posts:latest_id'
+# Новый пост увеличивает версию, и отметка с прежней версией считается
+# устаревшей. Посты из bulk_create сигналов не шлют, поэтому отметка
+# всё равно живёт недолго.
+LATEST_POST_VERSION_KEY = 'posts:latest_id:version'
+LATEST_POST_TIMEOUT = 5
+# Число архивных постов страницы кэшируется: архив меняет только
+# archive_posts, и он сбрасывает эти записи, сменив версию.
+ARCHIVE_VERSION_KEY = 'posts:archive_version'
+ARCHIVE_COUNT_KEY = 'posts:archive_count:{}:{}'
+ARCHIVE_COUNT_TIMEOUT = 60 * 60
+
+
+class ChainedPosts:
+    """Горячие посты, за ними архивные - одной последовательностью
+    для Paginator. Архив старше любого горячего поста, поэтому порядок
+    по дате сохраняется, а к архиву обращаемся, только когда страница
+    выходит за горячий диапазон. Число архивных постов Paginator
+    берёт из кэша, а не считает по архиву на каждой странице."""
+
+    def __init__(self, hot, cold):
+        self.hot = hot
+        self.cold = cold
+
+    @cached_property
+    def hot_count(self):
+        return self.hot.count()
+
+    def count(self):
+        return self.hot_count + cached_count(self.cold)
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            return self[index:index + 1][0]
+        start, stop = index.start or 0, index.stop
+        posts = []
+        if start < self.hot_count:
+            posts.extend(self.hot[start:stop])
+        if stop is None or stop > self.hot_count:
+            posts.extend(self.cold[
+                max(start - self.hot_count, 0):
+                None if stop is None else stop - self.hot_count
+            ])
+        return posts
+
+
+def bump_archive_version():
+    """Сбрасывает закэшированные числа архивных постов."""
+    try:
+        cache.incr(ARCHIVE_VERSION_KEY)
+    except ValueError:
+        cache.set(ARCHIVE_VERSION_KEY, 1, None)
+
+
+def cached_count(queryset):
+    """queryset.count() с кэшем по тексту запроса и версии архива."""
+    query = hashlib.md5(str(queryset.query).encode()).hexdigest()
+    key = ARCHIVE_COUNT_KEY.format(
+        cache.get(ARCHIVE_VERSION_KEY, 0), query
+    )
+    count = cache.get(key)
+    if count is None:
+        count = queryset.count()
+        cache.set(key, count, ARCHIVE_COUNT_TIMEOUT)
+    return count
+
 
+def keyset_batches(queryset, fields, size):
+    """Строки values_list пачками по pk: каждая пачка - отдельный
+    запрос по индексу, без OFFSET и без чтения всей таблицы."""
+    last_pk = 0
+    while True:
+        rows = list(
+            queryset.filter(pk__gt=last_pk).order_by('pk')
+            .values_list('pk', *fields)[:size]
+        )
+        if not rows:
+            return
+        yield rows
+        last_pk = rows[-1][0]
 
-def paginate_page(request, posts):
-    """Функция для разбивки постов на страницы."""
+
+def parallel_map(func, batches, processes):
+    """Результаты func для каждой пачки из batches, посчитанные в
+    processes дочерних процессах (при одном - в текущем), по порядку.
+
+    func выполняется без базы. Пачки берутся не больше чем по одной на
+    процесс за раз, чтобы не читать в память всю таблицу."""
+    if processes <= 1:
+        yield from map(func, batches)
+        return
+    # Дочерние процессы не должны унаследовать открытые соединения.
+    connections.close_all()
+    with ProcessPoolExecutor(processes) as pool:
+        while True:
+            chunk = list(islice(batches, processes))
+            if not chunk:
+                return
+            yield from pool.map(func, chunk)
+
+
+def paginate_page(request, posts, archive=None):
+    """Функция для разбивки постов на страницы.
+
+    archive - архивные посты, которые показываются после posts.
+    Миниатюры картинок страницы сразу находятся в post.thumbnail."""
+    if archive is not None:
+        posts = ChainedPosts(posts, archive)
     paginator = Paginator(posts, settings.LIMIT)
     page_number = request.GET.get('page')
-    return paginator.get_page(page_number)
+    return thumbnails.resolve_page(paginator.get_page(page_number))
+
+
+def latest_post_id():
+    """id самого нового поста: из кэша, пока версия не сменилась,
+    иначе - по индексу pk.
+
+    Версия читается до запроса к базе, а пост увеличивает её после
+    коммита: если запрос пост не увидел, сохранённая с ним версия уже
+    устарела, и следующий вызов перечитает базу."""
+    values = cache.get_many([LATEST_POST_VERSION_KEY, LATEST_POST_KEY])
+    version = values.get(LATEST_POST_VERSION_KEY, 0)
+    cached = values.get(LATEST_POST_KEY)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+    latest = Post.objects.aggregate(latest=Max('pk'))['latest'] or 0
+    cache.set(LATEST_POST_KEY, (version, latest), LATEST_POST_TIMEOUT)
+    return latest
+
+
+def refresh_comment_stats(posts):
+    """Пересчитывает comment_count и last_comment_at постов из
+    queryset posts одним UPDATE."""
+    comments = Comment.objects.filter(
+        post=OuterRef('pk')
+    ).order_by().values('post')
+    return posts.update(
+        comment_count=Coalesce(
+            Subquery(comments.annotate(count=Count('pk')).values('count')),
+            0
+        ),
+        last_comment_at=Subquery(
+            comments.annotate(last=Max('created')).values('last')
+        ),
+    )
+
+
+def delete_comments(comments):
+    """Удаляет комментарии одним DELETE, без сигнала post_delete на
+    каждую строку, и пересчитывает счётчики их постов один раз.
+    Возвращает число удалённых комментариев."""
+    post_ids = set(comments.values_list('post_id', flat=True))
+    # У комментариев нет зависимых строк, каскад собирать не нужно.
+    deleted = comments._raw_delete(comments.db)
+    refresh_comment_stats(Post.objects.filter(pk__in=post_ids))
+    return deleted
+
+
+def bump_latest_post_version():
+    """Сбрасывает отметку самого нового поста. Писатели только
+    увеличивают счётчик и не перезаписывают значения друг друга;
+    incr атомарен в Memcached и Redis, в файловом кэше - нет, и
+    потерянное увеличение устаревает через LATEST_POST_TIMEOUT."""
+    try:
+        cache.incr(LATEST_POST_VERSION_KEY)
+    except ValueError:
+        if not cache.add(LATEST_POST_VERSION_KEY, 1, None):
+            cache.incr(LATEST_POST_VERSION_KEY)
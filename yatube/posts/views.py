@@ -1,25 +1,50 @@
+from django.conf import settings
 from django.contrib.auth.decorators import login_required
 from .utils import paginate_page
 from django.shortcuts import render, get_object_or_404, redirect
 from django.views.decorators.cache import cache_page
+from django.views.decorators.http import require_POST
 
+from . import likes, lookups, pageviews, thumbnails
+from .readmodels import feed_queryset, feed_rows
 from .forms import PostForm, CommentForm
-from .models import Post, Group, User, Follow
+from .models import ArchivedPost, Post, User, Follow, FollowSuggestion, Like
+
+
+def follow_suggestions(user):
+    """Заранее посчитанные рекомендации, на кого подписаться."""
+    if not user.is_authenticated:
+        return FollowSuggestion.objects.none()
+    # Удаляемые пользователи скрыты сразу, до фоновой очистки.
+    return FollowSuggestion.objects.filter(
+        user=user, suggested__is_active=True
+    ).select_related('suggested')[:settings.SUGGESTIONS_LIMIT]
 
 
 @cache_page(20, key_prefix='index_page')
 def index(request):
     """Главная страница"""
-    last_posts = Post.objects.select_related('group', 'author')
+    last_posts = feed_queryset(Post.objects.visible())
     page_obj = paginate_page(request, last_posts)
     return render(request, 'posts/index.html', {'page_obj': page_obj})
 
 
+def trending(request):
+    """Популярные посты: рейтинг уже посчитан, читаем верх таблицы"""
+    posts = thumbnails.resolve(feed_rows(Post.objects.visible().filter(
+        trending__isnull=False
+    ).order_by('-trending__score')[:settings.TRENDING_LIMIT]))
+    return render(request, 'posts/trending.html', {'posts': posts})
+
+
 def group_posts(request, slug):
     """Страница постов выбранной группы"""
-    group = get_object_or_404(Group, slug=slug)
-    posts = group.posts.select_related('group', 'author').all()
-    page_obj = paginate_page(request, posts)
+    group = lookups.groups.get_or_404(slug)
+    posts = feed_queryset(group.posts.visible())
+    archive = feed_queryset(
+        group.archived_posts.filter(author__is_active=True)
+    )
+    page_obj = paginate_page(request, posts, archive)
     return render(
         request,
         'posts/group_list.html',
@@ -29,26 +54,72 @@ def group_posts(request, slug):
 
 def profile(request, username):
     """Страница постов выбранного автора"""
-    author = get_object_or_404(User, username=username)
-    posts = author.posts.select_related('group', 'author').all()
-    page_obj = paginate_page(request, posts)
+    author = lookups.users.get_or_404(username)
+    posts = feed_queryset(author.posts.visible())
+    archive = feed_queryset(author.archived_posts.all())
+    page_obj = paginate_page(request, posts, archive)
     following = request.user.is_authenticated and author.following.exists()
     context = {
         'page_obj': page_obj,
         'author': author,
-        'following': following
+        'following': following,
+        'suggestions': follow_suggestions(request.user),
     }
     return render(request, 'posts/profile.html', context)
 
 
+def tag_posts(request, tag):
+    """Страница постов с хэштегом"""
+    posts = feed_queryset(
+        Post.objects.visible().filter(tags__tag=tag.lower())
+    ).order_by('-tags__pub_date', '-tags__post__pk')
+    page_obj = paginate_page(request, posts)
+    return render(
+        request,
+        'posts/tag.html',
+        {'tag': tag.lower(), 'page_obj': page_obj}
+    )
+
+
+def mentions(request, username):
+    """Страница постов, в которых упомянут пользователь"""
+    user = lookups.users.get_or_404(username)
+    posts = feed_queryset(
+        Post.objects.visible().filter(mentions__user=user)
+    ).order_by('-mentions__pub_date', '-mentions__post__pk')
+    page_obj = paginate_page(request, posts)
+    return render(
+        request,
+        'posts/mentions.html',
+        {'author': user, 'page_obj': page_obj}
+    )
+
+
 def post_detail(request, post_id):
-    """Страница выбранного поста"""
-    post = get_object_or_404(Post, pk=post_id)
+    """Страница выбранного поста, старые посты - из архива"""
+    post = Post.objects.visible().filter(pk=post_id).first()
+    if post is None:
+        post = get_object_or_404(
+            ArchivedPost.objects.filter(author__is_active=True), pk=post_id
+        )
+    # Миниатюра - как в ленте: без картинки или если исходник не
+    # открылся, post.thumbnail - None и картинка не выводится.
+    thumbnails.resolve([post])
     form = CommentForm(request.POST)
     context = {
         'post': post,
         'form': form,
+        'comments': post.comments.filter(
+            author__is_active=True
+        ).select_related('author'),
+        'liked': (
+            request.user.is_authenticated and not post.is_archived
+            and Like.objects.filter(user=request.user, post=post).exists()
+        ),
+        'views': 0 if post.is_archived else pageviews.view_count(post.pk),
     }
+    if not post.is_archived:
+        pageviews.register_view(request, post.pk)
     return render(request, 'posts/post_detail.html', context)
 
 
@@ -73,7 +144,7 @@ def post_edit(request, post_id):
     если пользователь - не автор - переход на страницу поста.
     После успешного редактирования - переход на страницу поста"""
     post = get_object_or_404(
-        Post, pk=post_id
+        Post.objects.visible(), pk=post_id
     )
     if request.user != post.author:
         return redirect('posts:post_detail', post_id)
@@ -97,7 +168,7 @@ def post_edit(request, post_id):
 @login_required
 def add_comment(request, post_id):
     """Создание комментария к посту"""
-    post = get_object_or_404(Post, pk=post_id)
+    post = get_object_or_404(Post.objects.visible(), pk=post_id)
     form = CommentForm(request.POST or None)
     if form.is_valid():
         comment = form.save(commit=False)
@@ -107,20 +178,42 @@ def add_comment(request, post_id):
     return redirect('posts:post_detail', post_id=post_id)
 
 
+@login_required
+@require_POST
+def post_like(request, post_id):
+    """Лайк поста"""
+    post = get_object_or_404(Post.objects.visible(), pk=post_id)
+    likes.like(request.user, post)
+    return redirect('posts:post_detail', post_id=post_id)
+
+
+@login_required
+@require_POST
+def post_unlike(request, post_id):
+    """Отмена лайка"""
+    post = get_object_or_404(Post.objects.visible(), pk=post_id)
+    likes.unlike(request.user, post)
+    return redirect('posts:post_detail', post_id=post_id)
+
+
 @login_required
 def follow_index(request):
     """Страница постов авторов, на которых подписан текущий пользователь."""
     user = get_object_or_404(User, username=request.user)
-    posts_list = Post.objects.filter(
-        author__following__user=user).select_related('group', 'author')
+    posts_list = feed_queryset(Post.objects.visible().filter(
+        author__following__user=user))
     page_obj = paginate_page(request, posts_list)
-    return render(request, 'posts/follow.html', {'page_obj': page_obj})
+    context = {
+        'page_obj': page_obj,
+        'suggestions': follow_suggestions(user),
+    }
+    return render(request, 'posts/follow.html', context)
 
 
 @login_required
 def profile_follow(request, username):
     """Подписаться на автора"""
-    author = get_object_or_404(User, username=username)
+    author = lookups.users.get_or_404(username)
     if request.user != author and not author.following.exists():
         Follow.objects.create(user=request.user, author=author)
     return redirect('posts:profile', username=username)
@@ -129,7 +222,7 @@ def profile_follow(request, username):
 @login_required
 def profile_unfollow(request, username):
     """Дизлайк, отписка"""
-    author = get_object_or_404(User, username=username)
+    author = lookups.users.get_or_404(username)
     follow = Follow.objects.filter(user=request.user, author=author)
     if follow.exists():
         follow.delete()
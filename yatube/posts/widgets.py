@@ -0,0 +1,59 @@
+from django import forms
+from django.core.exceptions import ValidationError
+from django.urls import reverse
+
+
+class AutocompleteSelect(forms.Select):
+    """Select, в котором отрисованы только выбранные значения:
+    остальные варианты подгружает скрипт из API автодополнения."""
+
+    def __init__(self, url_name, attrs=None):
+        super().__init__(attrs)
+        self.url_name = url_name
+
+    @property
+    def media(self):
+        return forms.Media(js=['js/autocomplete.js'])
+
+    def get_context(self, name, value, attrs):
+        context = super().get_context(name, value, attrs)
+        context['widget']['attrs']['data-autocomplete-url'] = reverse(
+            self.url_name
+        )
+        return context
+
+    def selected_keys(self, field, value):
+        """Выбранные значения, приведённые к типу ключа. Мусор из
+        невалидной формы (например, 'abc' вместо id) отбрасываем:
+        форма уже покажет ошибку поля."""
+        key = field.to_field_name or 'pk'
+        model_field = (
+            field.queryset.model._meta.pk if key == 'pk'
+            else field.queryset.model._meta.get_field(key)
+        )
+        keys = []
+        for item in value:
+            if not item:
+                continue
+            try:
+                keys.append(model_field.to_python(item))
+            except (ValidationError, ValueError, TypeError):
+                continue
+        return key, keys
+
+    def optgroups(self, name, value, attrs=None):
+        field = self.choices.field
+        choices = [('', field.empty_label or '')]
+        key, selected = self.selected_keys(field, value)
+        if selected:
+            choices += [
+                (field.prepare_value(obj), field.label_from_instance(obj))
+                for obj in field.queryset.filter(**{f'{key}__in': selected})
+            ]
+        return [
+            (None, [self.create_option(
+                name, option_value, label,
+                str(option_value) in value, index, attrs=attrs
+            )], index)
+            for index, (option_value, label) in enumerate(choices)
+        ]
@@ -0,0 +1,32 @@
+document.querySelectorAll('select[data-autocomplete-url]').forEach(function (select) {
+  var input = document.createElement('input');
+  input.type = 'search';
+  input.className = 'form-control mb-2';
+  input.placeholder = 'Начните вводить название';
+  select.parentNode.insertBefore(input, select);
+  var timer = null;
+  input.addEventListener('input', function () {
+    clearTimeout(timer);
+    timer = setTimeout(function () {
+      if (!input.value) {
+        return;
+      }
+      var url = select.dataset.autocompleteUrl + '?q=' + encodeURIComponent(input.value);
+      fetch(url).then(function (response) {
+        return response.json();
+      }).then(function (data) {
+        var selected = select.value;
+        Array.from(select.options).forEach(function (option) {
+          if (option.value && option.value !== selected) {
+            select.removeChild(option);
+          }
+        });
+        data.results.forEach(function (item) {
+          if (String(item.id) !== selected) {
+            select.add(new Option(item.title || item.username, item.id));
+          }
+        });
+      });
+    }, 200);
+  });
+});
@@ -0,0 +1,12 @@
+from django.contrib import admin
+
+from .models import OutboxMessage
+
+
+@admin.register(OutboxMessage)
+class OutboxMessageAdmin(admin.ModelAdmin):
+    list_display = ('recipient', 'subject', 'status', 'attempts', 'created',
+                    'sent_at')
+    list_filter = ('status',)
+    search_fields = ('recipient', 'subject')
+    empty_value_display = '-пусто-'
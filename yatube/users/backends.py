@@ -0,0 +1,57 @@
+import hashlib
+
+from django.core.mail.backends.base import BaseEmailBackend
+from django.db import transaction
+
+from jobs.models import Job
+from .models import OutboxMessage
+from .tasks import send_outbox
+
+
+def dedup_key(recipient, subject):
+    value = f'{recipient.lower()}\n{subject}'
+    return hashlib.sha256(value.encode()).hexdigest()
+
+
+def html_body(message):
+    for content, mimetype in getattr(message, 'alternatives', ()):
+        if mimetype == 'text/html':
+            return content
+    return ''
+
+
+class OutboxBackend(BaseEmailBackend):
+    """EMAIL_BACKEND, который только записывает письма в очередь.
+
+    Запрос не ждёт почтовый сервер: письма отправляет задача
+    send_outbox через OUTBOX_EMAIL_BACKEND. Пока письмо ждёт отправки,
+    такое же письмо тому же адресату заменяет его, а не дублирует."""
+
+    def send_messages(self, email_messages):
+        count = 0
+        with transaction.atomic():
+            for message in email_messages:
+                for recipient in message.recipients():
+                    self.enqueue(message, recipient)
+                count += 1
+            if count and not Job.objects.filter(
+                name=send_outbox.name, status=Job.PENDING
+            ).exists():
+                send_outbox.delay()
+        return count
+
+    def enqueue(self, message, recipient):
+        key = dedup_key(recipient, message.subject)
+        fields = {
+            'from_email': message.from_email,
+            'subject': message.subject,
+            'body': message.body,
+            'html_body': html_body(message),
+        }
+        updated = OutboxMessage.objects.filter(
+            dedup_key=key, status=OutboxMessage.PENDING
+        ).update(**fields)
+        if not updated:
+            OutboxMessage.objects.create(
+                recipient=recipient, dedup_key=key, **fields
+            )
@@ -0,0 +1,50 @@
+from django.db import models
+
+
+class OutboxMessage(models.Model):
+    """Письмо, ожидающее отправки фоновым обработчиком."""
+    PENDING = 'pending'
+    SENT = 'sent'
+    FAILED = 'failed'
+    STATUS_CHOICES = (
+        (PENDING, 'Ожидает отправки'),
+        (SENT, 'Отправлено'),
+        (FAILED, 'Ошибка'),
+    )
+
+    recipient = models.EmailField(verbose_name='Получатель')
+    dedup_key = models.CharField(
+        verbose_name='Ключ дедупликации',
+        max_length=64,
+        db_index=True,
+        help_text='Одинаковые письма одному адресату не дублируются'
+    )
+    from_email = models.CharField(verbose_name='Отправитель', max_length=254)
+    subject = models.CharField(verbose_name='Тема', max_length=998)
+    body = models.TextField(verbose_name='Текст')
+    html_body = models.TextField(verbose_name='HTML', blank=True)
+    status = models.CharField(
+        verbose_name='Статус',
+        max_length=10,
+        choices=STATUS_CHOICES,
+        default=PENDING
+    )
+    attempts = models.PositiveSmallIntegerField(
+        verbose_name='Попыток',
+        default=0
+    )
+    created = models.DateTimeField(
+        verbose_name='Создано',
+        auto_now_add=True
+    )
+    sent_at = models.DateTimeField(
+        verbose_name='Отправлено',
+        null=True,
+        blank=True
+    )
+
+    class Meta:
+        ordering = ['created']
+
+    def __str__(self):
+        return f'{self.recipient}: {self.subject}'
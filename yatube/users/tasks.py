@@ -0,0 +1,66 @@
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db.models import F
+from django.utils import timezone
+
+from jobs.tasks import task
+from .models import OutboxMessage
+
+
+def build_message(outbox_message, connection):
+    message = EmailMultiAlternatives(
+        subject=outbox_message.subject,
+        body=outbox_message.body,
+        from_email=outbox_message.from_email,
+        to=[outbox_message.recipient],
+        connection=connection,
+    )
+    if outbox_message.html_body:
+        message.attach_alternative(outbox_message.html_body, 'text/html')
+    return message
+
+
+@task(priority=10, max_attempts=5)
+def send_outbox():
+    """Отправляем ожидающие письма пачками через одно соединение.
+
+    Если хотя бы одно письмо не ушло, задача падает и повторяется
+    позже; письма, исчерпавшие попытки, помечаются ошибкой."""
+    failed = 0
+    while True:
+        batch = list(OutboxMessage.objects.filter(
+            status=OutboxMessage.PENDING,
+            attempts__lt=settings.OUTBOX_MAX_ATTEMPTS,
+        )[:settings.OUTBOX_BATCH_SIZE])
+        if not batch:
+            break
+        failed += send_batch(batch)
+        if len(batch) < settings.OUTBOX_BATCH_SIZE or failed:
+            break
+    OutboxMessage.objects.filter(
+        status=OutboxMessage.PENDING,
+        attempts__gte=settings.OUTBOX_MAX_ATTEMPTS,
+    ).update(status=OutboxMessage.FAILED)
+    if failed:
+        raise RuntimeError(f'Не отправлено писем: {failed}')
+
+
+def send_batch(batch):
+    sent, failed = [], []
+    connection = get_connection(settings.OUTBOX_EMAIL_BACKEND)
+    with connection:
+        for outbox_message in batch:
+            try:
+                build_message(outbox_message, connection).send()
+            except Exception:
+                failed.append(outbox_message.pk)
+            else:
+                sent.append(outbox_message.pk)
+    OutboxMessage.objects.filter(pk__in=sent).update(
+        status=OutboxMessage.SENT, sent_at=timezone.now(),
+        attempts=F('attempts') + 1
+    )
+    OutboxMessage.objects.filter(pk__in=failed).update(
+        attempts=F('attempts') + 1
+    )
+    return len(failed)
@@ -0,0 +1,52 @@
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.mail.backends.base import BaseEmailBackend
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from jobs.worker import run_pending
+from .models import OutboxMessage
+
+User = get_user_model()
+
+
+@override_settings(
+    EMAIL_BACKEND='users.backends.OutboxBackend',
+    OUTBOX_EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend',
+)
+class OutboxTest(TestCase):
+    def setUp(self):
+        User.objects.create_user(
+            username='auth', email='auth@example.com', password='1234567'
+        )
+
+    def test_password_reset_goes_through_outbox(self):
+        """Сброс пароля только ставит письмо в очередь, повторный запрос
+        его не дублирует, отправляет фоновая задача."""
+        for _ in range(2):
+            response = self.client.post(
+                reverse('users:password_reset_form'),
+                {'email': 'auth@example.com'}
+            )
+            self.assertEqual(response.status_code, 302)
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(OutboxMessage.objects.count(), 1)
+        run_pending()
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ['auth@example.com'])
+        self.assertEqual(
+            OutboxMessage.objects.get().status, OutboxMessage.SENT
+        )
+
+    @override_settings(OUTBOX_EMAIL_BACKEND='users.tests.BrokenBackend')
+    def test_failed_send_is_retried(self):
+        mail.send_mail('Тема', 'Текст', None, ['auth@example.com'])
+        run_pending()
+        message = OutboxMessage.objects.get()
+        self.assertEqual(message.status, OutboxMessage.PENDING)
+        self.assertEqual(message.attempts, 1)
+
+
+class BrokenBackend(BaseEmailBackend):
+    def send_messages(self, email_messages):
+        raise ConnectionError('Почтовый сервер недоступен')
@@ -19,6 +19,85 @@ ALLOWED_HOSTS = [
 
 LIMIT = 10
 
+# Ответы короче этого (в байтах) не сжимаются.
+GZIP_MIN_LENGTH = 512
+
+# Проверка новых постов: предел счётчика и параметры long polling (сек).
+# Ожидающий запрос держит воркер WSGI на всё время ожидания.
+NEW_POSTS_CAP = 100
+POLL_MAX_TIMEOUT = 25
+POLL_INTERVAL = 0.5
+
+# Сколько рекомендаций "на кого подписаться" показывать на странице.
+SUGGESTIONS_LIMIT = 5
+
+# Популярные посты: период полураспада рейтинга (сек), порог
+# вытеснения из таблицы рейтинга и длина страницы.
+TRENDING_HALF_LIFE = 6 * 60 * 60
+TRENDING_MIN_SCORE = 0.05
+TRENDING_LIMIT = 20
+
+# Сколько вариантов отдаёт автодополнение групп и пользователей.
+AUTOCOMPLETE_LIMIT = 10
+
+# Длина начала поста в карточках лент, символов.
+EXCERPT_LENGTH = 300
+
+# Счётчик лайков поста пересчитывается не чаще раза в столько секунд.
+LIKES_FLUSH_DELAY = 10
+
+# Просмотры постов: повтор той же сессией в течение VIEWS_DEDUP_WINDOW
+# не считается, буфер процесса пишется в базу раз в VIEWS_FLUSH_INTERVAL
+# секунд.
+VIEWS_DEDUP_WINDOW = 30 * 60
+VIEWS_FLUSH_INTERVAL = 30
+
+# Кэш поиска группы по slug и пользователя по username: время жизни в
+# общем кэше, для несуществующих значений, и LRU в памяти процесса
+# (размер и время жизни записи, сек).
+LOOKUP_CACHE_TIMEOUT = 60 * 10
+LOOKUP_NEGATIVE_TIMEOUT = 60
+LOOKUP_LOCAL_SIZE = 1000
+LOOKUP_LOCAL_TTL = 5
+
+# Списки в админке: до этого числа строк считаются точно, дальше -
+# оценка размера таблицы.
+ADMIN_EXACT_COUNT_LIMIT = 10000
+
+# Очередь фоновых задач (manage.py run_worker): сколько задач забирать
+# за раз, пауза опроса и первая пауза перед повтором (сек), через
+# сколько секунд задача упавшего воркера возвращается в очередь.
+JOBS_BATCH_SIZE = 10
+JOBS_POLL_INTERVAL = 1
+JOBS_RETRY_DELAY = 10
+JOBS_STALE_AFTER = 15 * 60
+# Выполненные задачи хранятся JOBS_KEEP_DONE секунд, потом воркер
+# удаляет их пачками по JOBS_PURGE_BATCH_SIZE.
+JOBS_KEEP_DONE = 24 * 60 * 60
+JOBS_PURGE_BATCH_SIZE = 1000
+
+# Фоновое удаление: сколько зависимых строк удалять за одну задачу.
+DELETION_BATCH_SIZE = 500
+
+# Архив: посты старше ARCHIVE_AFTER_DAYS дней переносит archive_posts,
+# по ARCHIVE_BATCH_SIZE за транзакцию.
+ARCHIVE_AFTER_DAYS = 365
+ARCHIVE_BATCH_SIZE = 500
+
+# Ограничение частоты запросов по имени вьюхи, отдельно для IP и сессии:
+# 'N/период' (s, m, h, d) для POST и других пишущих методов или
+# ('N/период', методы). Лишние запросы получают 429.
+RATELIMITS = {
+    'posts:post_create': '10/m',
+    'posts:add_comment': '20/m',
+    'posts:profile_follow': ('30/m', ('GET',)),
+    'posts:post_like': '60/m',
+    'posts:post_unlike': '60/m',
+    'api:upload_create': '20/m',
+    'users:signup': '5/m',
+    'users:login': '10/m',
+}
+
 INSTALLED_APPS = [
     'django.contrib.admin',
     'django.contrib.auth',
@@ -30,20 +109,27 @@ INSTALLED_APPS = [
     'users.apps.UsersConfig',
     'core.apps.CoreConfig',
     'about.apps.AboutConfig',
+    'api.apps.ApiConfig',
+    'jobs.apps.JobsConfig',
     'sorl.thumbnail',
 ]
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'core.compression.CachedGZipMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
+    'core.ratelimit.RateLimitMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'core.auth.CachedAuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
 ROOT_URLCONF = 'yatube.urls'
+# Сессии и пользователь сессии читаются из кэша, а не из базы.
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+AUTH_USER_CACHE_TIMEOUT = 60 * 60
 LOGIN_URL = 'users:login'
 LOGIN_REDIRECT_URL = 'posts:index'
 # LOGOUT_REDIRECT_URL = 'posts:index'
@@ -105,7 +191,19 @@ STATIC_URL = '/static/'
 
 STATICFILES_DIRS = [os.path.join(BASE_DIR, 'static')]
 
-EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
+# collectstatic добавляет хэш в имена файлов и готовит .gz/.br копии,
+# в продакшене их отдаёт core.static.CompressedStaticMiddleware (wsgi.py).
+STATIC_ROOT = os.path.join(BASE_DIR, 'collected_static')
+
+STATICFILES_STORAGE = 'core.storage.CompressedManifestStaticFilesStorage'
+
+# Письма сначала попадают в очередь (users.OutboxMessage), а отправляет
+# их фоновая задача через OUTBOX_EMAIL_BACKEND.
+EMAIL_BACKEND = 'users.backends.OutboxBackend'
+
+OUTBOX_EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
+OUTBOX_BATCH_SIZE = 50
+OUTBOX_MAX_ATTEMPTS = 5
 
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
 
@@ -114,8 +212,25 @@ CSRF_FAILURE_VIEW = 'core.views.csrf_failure'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Загрузка картинок по частям через API: каталог недокачанных файлов,
+# максимальный размер файла, блок чтения тела запроса (байт) и через
+# сколько секунд брошенная загрузка удаляется (cleanup_uploads).
+UPLOAD_TEMP_DIR = os.path.join(BASE_DIR, 'uploads_tmp')
+UPLOAD_MAX_SIZE = 20 * 1024 * 1024
+UPLOAD_READ_SIZE = 64 * 1024
+UPLOAD_EXPIRE = 24 * 60 * 60
+
+# Кэш общий для всех процессов: на нём держатся лимиты частоты,
+# сессии, пользователь сессии и сброс локальных индексов. С SQLite
+# сайт живёт на одном сервере, и файлового кэша достаточно; на
+# нескольких серверах - Memcached или Redis. LocMem у каждого процесса
+# свой, с ним сайт не запускается (core/checks.py).
 CACHES = {
     'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.path.join(BASE_DIR, 'django_cache'),
+        'OPTIONS': {'MAX_ENTRIES': 10000},
     }
 }
+# Тесты получают свой временный каталог кэша (core/testing.py).
+TEST_RUNNER = 'core.testing.TemporaryCacheRunner'
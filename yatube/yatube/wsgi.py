@@ -14,3 +14,9 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yatube.settings')
 
 application = get_wsgi_application()
+
+from core.static import CompressedStaticMiddleware  # noqa: E402
+from posts.pageviews import start_flusher  # noqa: E402
+
+application = CompressedStaticMiddleware(application)
+start_flusher()